@@ -0,0 +1,158 @@
+"""Аутентификация по JWT без запроса пользователя к базе.
+
+Токен, выданный эндпоинтом auth/token, содержит подписанные claims
+username, role, is_superuser и is_active. По ним строится пользователь
+через User.from_db: остальные поля отложены и загружаются из базы,
+только если представление к ним обратится.
+
+Роль в токене живёт до его истечения, поэтому изменение полей claims
+или удаление пользователя сдвигает его версию claims в общей для
+процессов таблице версий моделей (метка USER_CLAIMS_VERSION_LABEL), а
+migrate и flush — общую версию всех claims (CLAIMS_VERSION_LABEL).
+Токен хранит обе версии, при которых выпущен, и его claims принимаются,
+только пока они актуальны. Иначе, как и для токенов без claims
+(выпущенных через AccessToken.for_user), claims берутся из кеша
+процесса, действующего до следующего сдвига версий, а при промахе — из
+базы.
+
+Версия пользователя нужна, только пока живы выпущенные до её сдвига
+токены: записи старше ACCESS_TOKEN_LIFETIME удаляются, и таблица версий
+не растёт с числом пользователей.
+"""
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from reviews.models import ModelVersion, User
+from .cache import bump_versions, find_versions, get_versions
+from .metrics import timed
+
+USER_CLAIMS = ('username', 'role', 'is_superuser', 'is_active')
+CLAIMS_VERSION_CLAIM = 'claims_version'
+CLAIMS_VERSION_LABEL = 'reviews.user:claims'
+USER_CLAIMS_VERSION_LABEL = CLAIMS_VERSION_LABEL + ':{user_id}'
+DELETED = 'deleted'
+
+_token_users = {}
+_token_users_lock = threading.Lock()
+
+
+def user_claims(user):
+    return {claim: getattr(user, claim) for claim in USER_CLAIMS}
+
+
+def loaded_claims(user):
+    """Claims, загруженные в объект пользователя, без отложенных полей."""
+    return {
+        claim: user.__dict__[claim] for claim in USER_CLAIMS
+        if claim in user.__dict__
+    }
+
+
+def claims_version(user_id):
+    """Общая версия claims и версия claims пользователя."""
+    (version,) = get_versions([CLAIMS_VERSION_LABEL])
+    (user_version,) = find_versions([
+        USER_CLAIMS_VERSION_LABEL.format(user_id=user_id)
+    ])
+    return [version, user_version]
+
+
+def access_token_for(user):
+    """Access-токен с claims для аутентификации без запроса к базе."""
+    token = RefreshToken.for_user(user).access_token
+    for claim, value in user_claims(user).items():
+        token[claim] = value
+    token[CLAIMS_VERSION_CLAIM] = claims_version(user.pk)
+    return token
+
+
+def revoke_user_claims(user_id=None):
+    """Отзывает claims выданных токенов во всех процессах.
+
+    С user_id — только токены этого пользователя, без него — все. До
+    выпуска нового токена claims читаются из базы.
+    """
+    if user_id is None:
+        bump_versions([CLAIMS_VERSION_LABEL])
+        return
+    expired = timezone.now() - api_settings.ACCESS_TOKEN_LIFETIME
+    ModelVersion.objects.filter(
+        label__startswith=USER_CLAIMS_VERSION_LABEL.format(user_id=''),
+        modified__lt=expired,
+    ).delete()
+    bump_versions([USER_CLAIMS_VERSION_LABEL.format(user_id=user_id)])
+
+
+def cached_user_claims(user_id, version):
+    """Claims пользователя из кеша процесса или из базы.
+
+    Запись кеша действительна, пока не сдвинулась версия claims.
+    """
+    with _token_users_lock:
+        cached = _token_users.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    user = User.objects.filter(
+        **{api_settings.USER_ID_FIELD: user_id}
+    ).only(*USER_CLAIMS).first()
+    claims = DELETED if user is None else user_claims(user)
+    with _token_users_lock:
+        if len(_token_users) >= settings.TOKEN_USER_CACHE_SIZE:
+            _token_users.clear()
+        _token_users[user_id] = (version, claims)
+    return claims
+
+
+def token_user(user_id, claims):
+    """Пользователь с полями из claims; остальные поля отложены."""
+    values = {api_settings.USER_ID_FIELD: user_id, **claims}
+    fields = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in values
+    ]
+    return User.from_db(
+        DEFAULT_DB_ALIAS, fields, [values[field] for field in fields]
+    )
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """Аутентификация по claims токена с замером времени проверки.
+
+    Запросы без заголовка Authorization не замеряются.
+    """
+
+    def authenticate(self, request):
+        if self.get_header(request) is None:
+            return None
+        with timed('yamdb_jwt_auth_duration_seconds'):
+            return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Токен не содержит идентификатора пользователя.'
+            )
+        version = claims_version(user_id)
+        if validated_token.get(CLAIMS_VERSION_CLAIM) == version:
+            claims = {claim: validated_token[claim] for claim in USER_CLAIMS}
+        else:
+            claims = cached_user_claims(user_id, tuple(version))
+        if claims == DELETED:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found'
+            )
+        if not claims['is_active']:
+            raise AuthenticationFailed(
+                'Пользователь неактивен.', code='user_inactive'
+            )
+        return token_user(user_id, claims)
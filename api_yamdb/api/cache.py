@@ -0,0 +1,215 @@
+import hashlib
+import time
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import DateTimeField, ExpressionWrapper, F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.http import quote_etag
+
+from reviews.models import ModelVersion
+from .metrics import collector
+
+COUNT_KEY = 'pagination-count:{digest}'
+RESPONSE_KEY = 'response:{digest}'
+
+# Версии моделей, прочитанные в текущем HTTP-запросе: None вне запроса,
+# _NOT_LOADED — в начале запроса, до первого обращения.
+_NOT_LOADED = object()
+_request_versions = ContextVar('request_versions', default=None)
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def _whole_second():
+    # Last-Modified передаётся с точностью до секунды, и время изменения
+    # хранится так же, чтобы выданный заголовок сравнивался с ним точно.
+    return timezone.now().replace(microsecond=0)
+
+
+def _load_versions():
+    return {
+        label: (version, modified.timestamp())
+        for label, version, modified in ModelVersion.objects.values_list(
+            'label', 'version', 'modified'
+        )
+    }
+
+
+def _current_versions(labels):
+    """Версии и время изменения моделей из общей для процессов таблицы.
+
+    Таблица читается целиком одним запросом и запоминается до конца
+    HTTP-запроса. Отсутствующая версия заводится от текущего времени,
+    чтобы не совпасть с версиями до очистки таблицы.
+    """
+    versions = _request_versions.get()
+    if versions is None or versions is _NOT_LOADED:
+        loaded = _load_versions()
+        if versions is _NOT_LOADED:
+            _request_versions.set(loaded)
+        versions = loaded
+    missing = [label for label in labels if label not in versions]
+    if missing:
+        now = _whole_second()
+        ModelVersion.objects.bulk_create(
+            [
+                ModelVersion(label=label, version=time.time_ns(), modified=now)
+                for label in missing
+            ],
+            ignore_conflicts=True,
+        )
+        versions.update(_load_versions())
+    return versions
+
+
+def start_request_versions(**kwargs):
+    _request_versions.set(_NOT_LOADED)
+
+
+def finish_request_versions(**kwargs):
+    _request_versions.set(None)
+
+
+def get_versions(labels):
+    """Возвращает текущие версии меток в порядке их перечисления."""
+    versions = _current_versions(labels)
+    return tuple(versions[label][0] for label in labels)
+
+
+def find_versions(labels, default=0):
+    """Версии меток без заведения отсутствующих: default для них."""
+    versions = _current_versions([])
+    return tuple(
+        versions[label][0] if label in versions else default
+        for label in labels
+    )
+
+
+def get_model_versions(models):
+    """Возвращает текущие версии моделей в порядке их перечисления."""
+    return get_versions([model_label(model) for model in models])
+
+
+def bump_versions(labels):
+    """Сдвигает версии меток одним UPDATE, делая недействительными
+    зависимые ключи во всех процессах.
+
+    Время изменения округляется до секунды. Вторая запись в ту же
+    секунду сдвигает его на секунду вперёд: иначе клиент, получивший
+    Last-Modified после первой записи, получил бы ошибочный 304.
+    """
+    now = _whole_second()
+    updated = ModelVersion.objects.filter(label__in=labels).update(
+        version=F('version') + 1,
+        modified=Greatest(
+            Value(now, output_field=DateTimeField()),
+            ExpressionWrapper(
+                F('modified') + timedelta(seconds=1),
+                output_field=DateTimeField(),
+            ),
+        ),
+    )
+    if updated < len(labels):
+        ModelVersion.objects.bulk_create(
+            [
+                ModelVersion(label=label, version=time.time_ns(), modified=now)
+                for label in labels
+            ],
+            ignore_conflicts=True,
+        )
+    if _request_versions.get() is not None:
+        _request_versions.set(_NOT_LOADED)
+
+
+def bump_model_versions(models):
+    """Сдвигает версии моделей во всех процессах."""
+    bump_versions([model_label(model) for model in models])
+
+
+def bump_model_version(model):
+    """Сдвигает версию модели и возвращает её новое значение."""
+    bump_model_versions([model])
+    return get_model_versions([model])[0]
+
+
+def get_last_modified(models):
+    """Время последнего изменения любой из моделей (Unix time)."""
+    labels = [model_label(model) for model in models]
+    versions = _current_versions(labels)
+    return max(versions[label][1] for label in labels)
+
+
+def queryset_models(queryset):
+    """Модели всех таблиц, участвующих в запросе.
+
+    Неуправляемые модели (строки поискового индекса) меняются вместе со
+    своими объектами и отдельной версии не имеют.
+    """
+    tables = {
+        alias.table_name for alias in queryset.query.alias_map.values()
+    }
+    models = {queryset.model}
+    models.update(
+        model for model in apps.get_models()
+        if model._meta.managed and model._meta.db_table in tables
+    )
+    return sorted(models, key=lambda model: model._meta.label_lower)
+
+
+def queryset_digest(queryset, *parts):
+    """Ключ запроса: его SQL, параметры и версии задействованных моделей."""
+    sql, params = queryset.query.sql_with_params()
+    versions = get_model_versions(queryset_models(queryset))
+    payload = repr((sql, params, versions, parts)).encode()
+    return hashlib.md5(payload).hexdigest()
+
+
+def cached_count(queryset, exact=False):
+    """Количество строк запроса из кеша; при промахе или `exact` — COUNT."""
+    key = COUNT_KEY.format(digest=queryset_digest(queryset.order_by()))
+    count = None if exact else cache.get(key)
+    if not exact:
+        collector.inc('yamdb_cache_requests_total', {
+            'cache': 'pagination-count',
+            'result': 'miss' if count is None else 'hit',
+        })
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.PAGINATION_COUNT_TIMEOUT)
+    return count
+
+
+def response_etag(request, models):
+    """Сильный ETag ответа без его сериализации.
+
+    Зависит от URL запроса, выбранного формата ответа и версий моделей,
+    из которых ответ строится.
+    """
+    payload = repr((
+        request.build_absolute_uri(),
+        request.accepted_renderer.format,
+        get_model_versions(models),
+    )).encode()
+    return quote_etag(hashlib.md5(payload).hexdigest())
+
+
+def response_cache_key(request, models):
+    """Ключ ответа: полный URL запроса и версии моделей эндпоинта."""
+    payload = repr((
+        request.build_absolute_uri(), get_model_versions(models)
+    )).encode()
+    return RESPONSE_KEY.format(digest=hashlib.md5(payload).hexdigest())
+
+
+def record_response_cache(endpoint, hit):
+    collector.inc('yamdb_cache_requests_total', {
+        'cache': 'response', 'endpoint': endpoint,
+        'result': 'hit' if hit else 'miss',
+    })
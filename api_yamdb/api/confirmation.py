@@ -0,0 +1,120 @@
+import hashlib
+import hmac
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.generics import get_object_or_404
+
+from reviews.models import ConfirmationCode, User
+
+# Хеш кода, выданного до появления ConfirmationCode: код проверяется
+# паролем пользователя.
+LEGACY_CODE_HASH = ''
+
+
+def hash_code(salt, code):
+    return hashlib.sha256(f'{salt}:{code}'.encode()).hexdigest()
+
+
+def issue_code(user, new_user=False):
+    """Выдаёт пользователю новый код, заменяя прежний, и возвращает его.
+
+    Для только что созданного пользователя прежнего кода нет, и код
+    вставляется в транзакции создания пользователя. Существующему
+    пользователю код заменяется одним UPDATE, а если кода ещё нет —
+    вставляется. Вставка идёт в точке сохранения: если параллельный
+    запрос успел вставить код первым, IntegrityError перехватывается и
+    код перезаписывается.
+    """
+    code = secrets.token_hex(6)
+    salt = secrets.token_hex(8)
+    values = {
+        'salt': salt,
+        'code_hash': hash_code(salt, code),
+        'expires_at': timezone.now() + timedelta(
+            seconds=settings.CONFIRMATION_CODE_TTL
+        ),
+        'attempts': 0,
+    }
+    if new_user:
+        ConfirmationCode.objects.create(user=user, **values)
+        return code
+    codes = ConfirmationCode.objects.filter(user=user)
+    if codes.update(**values):
+        return code
+    try:
+        with transaction.atomic():
+            ConfirmationCode.objects.create(user=user, **values)
+    except IntegrityError:
+        codes.update(**values)
+    return code
+
+
+def legacy_confirmation(username):
+    """Заводит запись для кода, выданного до появления ConfirmationCode.
+
+    Такие коды хранились паролем пользователя. Запись даёт проверке
+    пароля тот же счётчик попыток, срок действия и однократное
+    погашение, что и у новых кодов. Для несуществующего пользователя
+    поднимается Http404.
+    """
+    user = get_object_or_404(User, username=username)
+    try:
+        with transaction.atomic():
+            return ConfirmationCode.objects.create(
+                user=user, salt='', code_hash=LEGACY_CODE_HASH,
+                expires_at=timezone.now() + timedelta(
+                    seconds=settings.CONFIRMATION_CODE_TTL
+                ),
+            )
+    except IntegrityError:
+        return ConfirmationCode.objects.select_related('user').get(user=user)
+
+
+def code_matches(confirmation, code):
+    if confirmation.code_hash == LEGACY_CODE_HASH:
+        return confirmation.user.check_password(code)
+    return hmac.compare_digest(
+        confirmation.code_hash, hash_code(confirmation.salt, code)
+    )
+
+
+def redeem_code(username, code):
+    """Проверяет код и возвращает пользователя, если код верен.
+
+    Верный код погашается сдвигом срока действия, неверный увеличивает
+    счётчик попыток. Оба изменения условны, поэтому из параллельных
+    запросов с одним кодом токен получит только один. Коды с истёкшим
+    сроком или исчерпанными попытками не принимаются. Для
+    несуществующего пользователя поднимается Http404.
+
+    Пока пользователю не выдан новый код, принимается код, сохранённый
+    паролем до появления ConfirmationCode (см. legacy_confirmation).
+    """
+    confirmation = ConfirmationCode.objects.select_related('user').filter(
+        user__username=username
+    ).first()
+    if confirmation is None:
+        confirmation = legacy_confirmation(username)
+    now = timezone.now()
+    if (
+        confirmation.expires_at <= now
+        or confirmation.attempts >= settings.CONFIRMATION_CODE_MAX_ATTEMPTS
+    ):
+        return None
+    if not code_matches(confirmation, str(code)):
+        ConfirmationCode.objects.filter(pk=confirmation.pk).update(
+            attempts=F('attempts') + 1
+        )
+        return None
+    redeemed = ConfirmationCode.objects.filter(
+        pk=confirmation.pk,
+        code_hash=confirmation.code_hash,
+        attempts=confirmation.attempts,
+        expires_at__gt=now,
+    ).update(expires_at=now)
+    return confirmation.user if redeemed else None
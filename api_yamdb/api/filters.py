@@ -1,6 +1,9 @@
 import django_filters as filters
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
 
 from reviews.models import Title
+from reviews.search import search
 
 
 class TitleFilter(filters.FilterSet):
@@ -11,3 +14,13 @@ class TitleFilter(filters.FilterSet):
     class Meta:
         model = Title
         fields = ('genre', 'category', 'name', 'year')
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск по параметру ?search= с ранжированием."""
+
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        return search(queryset, query)
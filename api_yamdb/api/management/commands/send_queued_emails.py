@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from api.metrics import collector
+from api.outbox import deliver_batch, prune_failed_emails, queue_depth
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пачками с повторами при ошибках и '
+        'удаляет устаревшие неотправленные письма. Без --loop '
+        'завершается, когда писем к отправке не осталось.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_QUEUE_BATCH_SIZE,
+            help='Сколько писем отправлять через одно соединение.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+            help='После скольких неудачных попыток письмо не отправлять.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, проверяя очередь каждые --interval '
+                 'секунд.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Пауза между проверками пустой очереди в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['max_attempts'] < 1:
+            raise CommandError(
+                'Размер пачки и число попыток должны быть положительными.'
+            )
+        totals = [0, 0, 0]
+        pruned = prune_failed_emails()
+        while True:
+            delivered = deliver_batch(
+                options['batch_size'], options['max_attempts']
+            )
+            totals = [total + count for total, count in zip(totals, delivered)]
+            collector.maybe_flush()
+            if any(delivered):
+                continue
+            if not options['loop']:
+                break
+            pruned += prune_failed_emails()
+            time.sleep(options['interval'])
+        sent, retried, failed = totals
+        depth = queue_depth()
+        self.stdout.write(
+            f'Отправлено: {sent}, отложено для повтора: {retried}, '
+            f'не отправлено: {failed}. В очереди: '
+            f'{depth["pending"]}, с ошибкой: {depth["failed"]}. '
+            f'Удалено устаревших с ошибкой: {pruned}.'
+        )
@@ -0,0 +1,273 @@
+"""Метрики приложения в текстовом формате Prometheus.
+
+Каждый процесс копит метрики в памяти и периодически сбрасывает их в
+свой файл metrics-<pid>.json в каталоге METRICS_DIR. Эндпоинт /metrics
+складывает файлы всех живых процессов, поэтому при нескольких воркерах
+видна общая картина. Процесс удаляет свой файл при выходе, а файлы
+процессов, завершившихся аварийно, удаляются при сборе метрик:
+Prometheus воспринимает уменьшение суммы как сброс счётчиков.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+FILE_PREFIX = 'metrics-'
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+FAST_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+Metric = namedtuple('Metric', 'kind help buckets', defaults=(None,))
+
+METRICS = {
+    'yamdb_requests_total': Metric(
+        'counter', 'Запросы к приложению по представлению и статусу.'
+    ),
+    'yamdb_request_duration_seconds': Metric(
+        'histogram', 'Время ответа по представлению и действию.',
+        LATENCY_BUCKETS,
+    ),
+    'yamdb_request_db_queries': Metric(
+        'histogram', 'Число SQL-запросов на один запрос к приложению.',
+        QUERY_BUCKETS,
+    ),
+    'yamdb_request_db_duration_seconds': Metric(
+        'histogram', 'Время SQL-запросов на один запрос к приложению.',
+        LATENCY_BUCKETS,
+    ),
+    'yamdb_cache_requests_total': Metric(
+        'counter', 'Обращения к кешу: попадания (hit) и промахи (miss).'
+    ),
+    'yamdb_email_queue_depth': Metric(
+        'gauge', 'Писем в очереди на отправку по статусам.'
+    ),
+    'yamdb_email_send_duration_seconds': Metric(
+        'histogram', 'Время отправки письма.', LATENCY_BUCKETS,
+    ),
+    'yamdb_jwt_auth_duration_seconds': Metric(
+        'histogram', 'Время проверки JWT-токена.', FAST_LATENCY_BUCKETS,
+    ),
+}
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', '\\\\').replace('\n', '\\n')
+        .replace('"', '\\"')
+    )
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{name}="{escape(value)}"' for name, value in labels)
+    return '{' + pairs + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def process_alive(pid):
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsCollector:
+    """Метрики процесса и их сложение по файлам всех процессов.
+
+    Значение счётчика — число, значение гистограммы — список количеств
+    наблюдений по корзинам (последняя — +Inf), их сумма и число.
+    Показатели (gauge) не складываются по процессам: их выставляет
+    эндпоинт /metrics непосредственно перед выдачей.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.values = {}
+        self.gauges = {}
+        self.flushed = time.monotonic()
+
+    def inc(self, name, labels, value=1):
+        key = (name, label_key(labels))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name, labels, value):
+        with self.lock:
+            self.gauges[(name, label_key(labels))] = value
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name].buckets
+        key = (name, label_key(labels))
+        with self.lock:
+            observed = self.values.setdefault(
+                key, [0] * (len(buckets) + 1) + [0, 0]
+            )
+            observed[bisect_left(buckets, value)] += 1
+            observed[-2] += value
+            observed[-1] += 1
+
+    def path(self):
+        return Path(settings.METRICS_DIR) / f'{FILE_PREFIX}{os.getpid()}.json'
+
+    def discard(self):
+        """Удаляет файл процесса."""
+        with self.flush_lock:
+            self.path().unlink(missing_ok=True)
+
+    def reset(self):
+        """Начинает метрики процесса заново.
+
+        Вызывается при запуске и после fork: дочерний процесс не должен
+        унаследовать счётчики родителя, а файл с его pid мог остаться от
+        прежнего владельца.
+        """
+        with self.lock:
+            self.values = {}
+            self.gauges = {}
+            self.flushed = time.monotonic()
+        self.discard()
+
+    def after_fork(self):
+        # Блокировки могли быть захвачены другим потоком родителя.
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.reset()
+
+    def flush(self):
+        """Сбрасывает метрики процесса в его файл атомарной заменой."""
+        with self.lock:
+            payload = [
+                [name, list(labels), value]
+                for (name, labels), value in self.values.items()
+            ]
+            self.flushed = time.monotonic()
+        if not payload:
+            return
+        path = self.path()
+        with self.flush_lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix('.tmp')
+            temporary.write_text(json.dumps(payload))
+            os.replace(temporary, path)
+
+    def maybe_flush(self):
+        if time.monotonic() - self.flushed >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def collect(self):
+        """Складывает метрики из файлов всех живых процессов."""
+        self.flush()
+        merged = {}
+        for path in Path(settings.METRICS_DIR).glob(f'{FILE_PREFIX}*.json'):
+            pid = path.stem[len(FILE_PREFIX):]
+            if pid.isdigit() and not process_alive(int(pid)):
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                payload = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in payload:
+                if name not in METRICS:
+                    continue
+                key = (name, tuple(tuple(pair) for pair in labels))
+                if isinstance(value, list):
+                    current = merged.setdefault(key, [0] * len(value))
+                    merged[key] = [a + b for a, b in zip(current, value)]
+                else:
+                    merged[key] = merged.get(key, 0) + value
+        with self.lock:
+            merged.update(self.gauges)
+        return merged
+
+    def render(self):
+        """Метрики всех процессов в текстовом формате Prometheus."""
+        merged = self.collect()
+        lines = []
+        for name, metric in METRICS.items():
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for (sample, labels), value in sorted(merged.items()):
+                if sample != name:
+                    continue
+                if metric.kind != 'histogram':
+                    lines.append(
+                        f'{name}{format_labels(labels)} {format_value(value)}'
+                    )
+                    continue
+                cumulative = 0
+                bounds = [str(bound) for bound in metric.buckets] + ['+Inf']
+                for bound, count in zip(bounds, value):
+                    cumulative += count
+                    lines.append(
+                        f'{name}_bucket'
+                        f'{format_labels(labels + (("le", bound),))} '
+                        f'{cumulative}'
+                    )
+                lines.append(
+                    f'{name}_sum{format_labels(labels)} '
+                    f'{format_value(value[-2])}'
+                )
+                lines.append(
+                    f'{name}_count{format_labels(labels)} {value[-1]}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+collector = MetricsCollector()
+collector.reset()
+os.register_at_fork(after_in_child=collector.after_fork)
+atexit.register(collector.discard)
+
+
+def view_label(view_func, method):
+    """Имя представления для меток: `TitlesViewSet.list` для DRF."""
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return f'{view_func.__module__}.{view_func.__name__}'
+    method = method.lower()
+    actions = getattr(view_func, 'actions', None) or {}
+    if method == 'head' and 'head' not in actions:
+        method = 'get'
+    return f'{cls.__name__}.{actions.get(method, method)}'
+
+
+@contextmanager
+def timed(name, **labels):
+    """Записывает время блока в гистограмму name с исходом ok или error."""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        collector.observe(
+            name, {**labels, 'outcome': outcome},
+            time.perf_counter() - started,
+        )
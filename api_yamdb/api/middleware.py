@@ -0,0 +1,162 @@
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import collector, view_label
+
+logger = logging.getLogger('api.requests')
+
+_current_metrics = ContextVar('request_metrics', default=None)
+_slow_requests = []
+_slow_requests_lock = threading.Lock()
+_slow_requests_order = itertools.count()
+
+
+class RequestMetrics:
+    """Счётчики одного запроса: SQL, сериализация и время представления."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0
+        self.serializer_seconds = 0
+        self.serializer_depth = 0
+        self.view_started = None
+        self.view_label = None
+        self.view_seconds = 0
+        self.sql = []
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_seconds += elapsed
+            if len(self.sql) < settings.SLOW_REQUEST_MAX_SQL:
+                self.sql.append({'sql': sql, 'ms': milliseconds(elapsed)})
+
+
+@contextmanager
+def serializer_timer():
+    """Учитывает время сериализации; вложенные сериализаторы не
+    считаются повторно."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    metrics.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_depth -= 1
+        if not metrics.serializer_depth:
+            metrics.serializer_seconds += time.perf_counter() - started
+
+
+def remember_slow_request(entry):
+    """Хранит SLOW_REQUESTS_KEPT самых медленных запросов процесса."""
+    item = (entry['total_ms'], next(_slow_requests_order), entry)
+    with _slow_requests_lock:
+        if len(_slow_requests) < settings.SLOW_REQUESTS_KEPT:
+            heapq.heappush(_slow_requests, item)
+        elif item[0] > _slow_requests[0][0]:
+            heapq.heapreplace(_slow_requests, item)
+
+
+def slow_requests():
+    with _slow_requests_lock:
+        return [entry for _, _, entry in sorted(_slow_requests, reverse=True)]
+
+
+def clear_slow_requests():
+    with _slow_requests_lock:
+        _slow_requests.clear()
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 3)
+
+
+class RequestTimingMiddleware:
+    """Замеряет запросы к API без DEBUG.
+
+    Считает SQL-запросы и их время через execute_wrapper, время
+    сериализации и представления. Итоги уходят в заголовок Server-Timing
+    и строку журнала api.requests в формате JSON, а самые медленные
+    запросы вместе с их SQL — в буфер, который видят администраторы.
+    Те же замеры попадают в метрики Prometheus по представлениям.
+    Запросы, выполняемые при отдаче потокового ответа, не учитываются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.record_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        finished = time.perf_counter()
+        total = finished - metrics.started
+        if metrics.view_started is not None:
+            metrics.view_seconds = finished - metrics.view_started
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={milliseconds(metrics.db_seconds)};'
+            f'desc="{metrics.queries} queries"',
+            f'serializer;dur={milliseconds(metrics.serializer_seconds)}',
+            f'view;dur={milliseconds(metrics.view_seconds)}',
+            f'total;dur={milliseconds(total)}',
+        ))
+        entry = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': getattr(request.resolver_match, 'view_name', None),
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': milliseconds(metrics.db_seconds),
+            'serializer_ms': milliseconds(metrics.serializer_seconds),
+            'view_ms': milliseconds(metrics.view_seconds),
+            'total_ms': milliseconds(total),
+        }
+        logger.info(json.dumps(entry, ensure_ascii=False))
+        entry['sql'] = metrics.sql
+        remember_slow_request(entry)
+        self.record_metrics(request, response, metrics, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+            metrics.view_label = view_label(view_func, request.method)
+
+    def record_metrics(self, request, response, metrics, total):
+        labels = {'view': metrics.view_label or 'unresolved'}
+        collector.inc('yamdb_requests_total', {
+            **labels, 'method': request.method,
+            'status': response.status_code,
+        })
+        collector.observe('yamdb_request_duration_seconds', labels, total)
+        collector.observe('yamdb_request_db_queries', labels, metrics.queries)
+        collector.observe(
+            'yamdb_request_db_duration_seconds', labels, metrics.db_seconds
+        )
+        collector.maybe_flush()
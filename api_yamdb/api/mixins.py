@@ -1,10 +1,114 @@
-from rest_framework import filters, mixins, viewsets
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import (filters, mixins, relations, serializers, status,
+                            viewsets)
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+
+from .cache import (get_last_modified, record_response_cache,
+                    response_cache_key, response_etag)
+from .permissions import IsAdminOrReadOnly, IsModeratorOrAdmin
+from .serializers import ModerationSerializer
+
+
+class ConditionalResponseMixin:
+    """Отвечает 304 на условный GET, не вызывая сериализаторы.
+
+    ETag и Last-Modified строятся по версиям моделей cache_models.
+    """
+
+    cache_models = ()
+
+    def not_modified(self, request, etag, last_modified):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            etags = parse_etags(if_none_match)
+            return '*' in etags or etag in etags
+        if_modified_since = parse_http_date_safe(
+            request.META.get('HTTP_IF_MODIFIED_SINCE', '')
+        )
+        # Время изменения хранится с точностью до секунды, как и
+        # Last-Modified, поэтому выданный заголовок сравнивается точно.
+        return (
+            if_modified_since is not None
+            and last_modified <= if_modified_since
+        )
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag = response_etag(request, self.cache_models)
+        last_modified = get_last_modified(self.cache_models)
+        if self.not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class ConditionalDetailResponseMixin(ConditionalResponseMixin):
+    """Условный GET также для получения отдельного объекта."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class CachedResponseMixin:
+    """Кеширует данные ответа на список до изменения моделей cache_models.
+
+    Нулевой RESPONSE_CACHE_TIMEOUT отключает кеш ответов.
+    """
+
+    cache_models = ()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_TIMEOUT:
+            return handler(request, *args, **kwargs)
+        key = response_cache_key(request, self.cache_models)
+        endpoint = f'{self.basename}-{self.action}'
+        data = cache.get(key)
+        if data is not None:
+            record_response_cache(endpoint, hit=True)
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        record_response_cache(endpoint, hit=False)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
 
-from .permissions import IsAdminOrReadOnly
+
+class CachedDetailResponseMixin(CachedResponseMixin):
+    """Кеширует также ответ на получение отдельного объекта."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
 
 
 class ReviewsModelMixin(
+    ConditionalResponseMixin,
+    CachedResponseMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -17,3 +121,113 @@ class ReviewsModelMixin(
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name', 'slug')
     lookup_field = 'slug'
+
+
+class BulkModerationMixin:
+    """Массовое удаление и скрытие объектов модератором.
+
+    Объекты из moderation_queryset() с первичными ключами из ids
+    обрабатываются одним запросом: delete_moderated и hide_moderated
+    получают queryset и возвращают число затронутых объектов.
+    """
+
+    delete_moderated = None
+    hide_moderated = None
+
+    def moderation_queryset(self):
+        return self.get_queryset()
+
+    def moderated(self, request):
+        serializer = ModerationSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        queryset = self.moderation_queryset().filter(
+            pk__in=serializer.validated_data['ids']
+        )
+        return queryset, serializer.validated_data['hidden']
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='bulk-delete',
+        url_name='bulk-delete',
+        permission_classes=(IsModeratorOrAdmin,),
+    )
+    def bulk_delete(self, request, *args, **kwargs):
+        queryset, _ = self.moderated(request)
+        return Response({'deleted': self.delete_moderated(queryset)})
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='bulk-hide',
+        url_name='bulk-hide',
+        permission_classes=(IsModeratorOrAdmin,),
+    )
+    def bulk_hide(self, request, *args, **kwargs):
+        queryset, hidden = self.moderated(request)
+        return Response({'updated': self.hide_moderated(queryset, hidden)})
+
+
+@lru_cache(maxsize=None)
+def plan_related(serializer_class, model, prefix=''):
+    """Собирает связи, которые сериализатор читает при выводе.
+
+    Связи «многие к одному» уходят в select_related, а связи «многие
+    ко многим» и обратные — в prefetch_related. Вложенные сериализаторы
+    разбираются рекурсивно.
+    """
+    select, prefetch = [], []
+    for field in serializer_class().fields.values():
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+        many = isinstance(
+            field, (relations.ManyRelatedField, serializers.ListSerializer)
+        )
+        nested = field.child if isinstance(
+            field, serializers.ListSerializer) else field
+        if not isinstance(nested, (
+            relations.RelatedField,
+            relations.ManyRelatedField,
+            serializers.BaseSerializer,
+        )) or isinstance(nested, relations.PrimaryKeyRelatedField):
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation:
+            continue
+        lookup = f'{prefix}{field.source}'
+        if many or model_field.many_to_many or model_field.one_to_many:
+            prefetch.append(lookup)
+            continue
+        select.append(lookup)
+        if isinstance(nested, serializers.BaseSerializer):
+            nested_select, nested_prefetch = plan_related(
+                type(nested), model_field.related_model, f'{lookup}__'
+            )
+            select.extend(nested_select)
+            prefetch.extend(nested_prefetch)
+    return tuple(select), tuple(prefetch)
+
+
+class RelatedPlanMixin:
+    """Заранее подгружает связи, которые выводит сериализатор действия."""
+
+    def get_queryset(self):
+        return self.plan_queryset(super().get_queryset())
+
+    def plan_queryset(self, queryset):
+        # Удаление не сериализует объект, и связи ему не нужны.
+        if self.action == 'destroy':
+            return queryset
+        select, prefetch = plan_related(
+            self.get_serializer_class(), queryset.model
+        )
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
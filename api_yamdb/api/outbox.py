@@ -0,0 +1,157 @@
+"""Очередь исходящих писем.
+
+Запрос только записывает письмо в таблицу OutgoingEmail, а отправляет
+его отдельный процесс командой send_queued_emails. Письма забираются
+пачками: на время отправки пачка «арендуется» условным UPDATE, который
+сдвигает send_after и помечает строки токеном аренды, и уходит через
+одно соединение с почтовым бэкендом. Неудачная отправка повторяется с
+экспоненциальной задержкой, после EMAIL_QUEUE_MAX_ATTEMPTS попыток
+письмо помечается как failed.
+
+Текст письма содержит код подтверждения, поэтому отправленные письма
+удаляются, у окончательно не отправленных текст стирается, а сами они
+удаляются через EMAIL_QUEUE_FAILED_TTL секунд.
+"""
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+from .metrics import timed
+
+
+def enqueue_email(subject, body, from_email, recipient):
+    return OutgoingEmail.objects.create(
+        subject=subject, body=body, from_email=from_email,
+        recipient=recipient,
+    )
+
+
+def queue_depth():
+    """Число писем в очереди по статусам."""
+    depth = dict.fromkeys(
+        (status for status, _ in OutgoingEmail.STATUS_CHOICES), 0
+    )
+    depth.update(
+        OutgoingEmail.objects.order_by().values_list('status').annotate(
+            total=Count('pk')
+        )
+    )
+    return depth
+
+
+def lease_emails(ids, now):
+    """Арендует письма ids, которые всё ещё ждут отправки.
+
+    UPDATE условен: письма, уже арендованные другим воркером между
+    выборкой и арендой, не затрагиваются. Возвращает арендованные письма.
+    """
+    token = secrets.token_hex(16)
+    leased = OutgoingEmail.objects.filter(
+        pk__in=ids, status=OutgoingEmail.PENDING, send_after__lte=now
+    ).update(
+        lease_token=token,
+        send_after=now + timedelta(seconds=settings.EMAIL_QUEUE_LEASE),
+    )
+    if not leased:
+        return []
+    return list(OutgoingEmail.objects.filter(lease_token=token))
+
+
+def claim_batch(batch_size):
+    """Забирает пачку писем, срок отправки которых наступил."""
+    now = timezone.now()
+    while True:
+        with transaction.atomic():
+            due = OutgoingEmail.objects.filter(
+                status=OutgoingEmail.PENDING, send_after__lte=now
+            )
+            if connection.features.has_select_for_update_skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            ids = list(due.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return []
+            batch = lease_emails(ids, now)
+        # Пустая аренда значит, что пачку забрал другой воркер: следующая
+        # выборка её уже не увидит.
+        if batch:
+            return batch
+
+
+def prune_failed_emails():
+    """Удаляет неотправленные письма старше EMAIL_QUEUE_FAILED_TTL."""
+    deleted, _ = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.FAILED,
+        created__lt=timezone.now() - timedelta(
+            seconds=settings.EMAIL_QUEUE_FAILED_TTL
+        ),
+    ).delete()
+    return deleted
+
+
+def send_batch(batch):
+    """Отправляет пачку через одно соединение.
+
+    Возвращает первичные ключи отправленных писем и ошибки остальных.
+    """
+    sent, errors = set(), {}
+    # Почтовые бэкенды бросают разные исключения; любое из них означает,
+    # что письмо нужно отправить повторно.
+    try:
+        with get_connection() as mail_connection:
+            for email in batch:
+                try:
+                    with timed('yamdb_email_send_duration_seconds'):
+                        EmailMessage(
+                            email.subject, email.body, email.from_email,
+                            [email.recipient], connection=mail_connection,
+                        ).send()
+                except Exception as error:
+                    errors[email.pk] = error
+                else:
+                    sent.add(email.pk)
+    except Exception as error:
+        for email in batch:
+            if email.pk not in sent:
+                errors.setdefault(email.pk, error)
+    return sent, errors
+
+
+def retry_delay(attempts):
+    return timedelta(
+        seconds=settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def deliver_batch(batch_size=None, max_attempts=None):
+    """Отправляет одну пачку писем и возвращает число отправленных,
+    отложенных для повтора и окончательно не отправленных."""
+    batch = claim_batch(batch_size or settings.EMAIL_QUEUE_BATCH_SIZE)
+    if not batch:
+        return 0, 0, 0
+    max_attempts = max_attempts or settings.EMAIL_QUEUE_MAX_ATTEMPTS
+    sent, errors = send_batch(batch)
+    OutgoingEmail.objects.filter(pk__in=sent).delete()
+    retried = failed = 0
+    now = timezone.now()
+    for email in batch:
+        if email.pk not in errors:
+            continue
+        email.attempts += 1
+        email.last_error = str(errors[email.pk])
+        if email.attempts >= max_attempts:
+            email.status = OutgoingEmail.FAILED
+            email.body = ''
+            failed += 1
+        else:
+            email.send_after = now + retry_delay(email.attempts)
+            retried += 1
+        email.save(update_fields=[
+            'attempts', 'last_error', 'status', 'send_after', 'body'
+        ])
+    return len(sent), retried, failed
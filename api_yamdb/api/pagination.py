@@ -0,0 +1,83 @@
+from functools import partial
+
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from .cache import cached_count
+
+
+class CachedCountPaginator(Paginator):
+    def __init__(self, *args, exact_count=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.exact_count = exact_count
+
+    @cached_property
+    def count(self):
+        return cached_count(self.object_list, exact=self.exact_count)
+
+
+class CachedCountPagination(PageNumberPagination):
+    """Постраничная пагинация без COUNT(*) на каждом запросе.
+
+    Общее количество берётся из кеша, ключ которого включает SQL запроса
+    и версии задействованных моделей: записи через ORM сразу делают его
+    недействительным, а прочие изменения видны не позже, чем через
+    PAGINATION_COUNT_TIMEOUT секунд. `?count=exact` пересчитывает его.
+    """
+
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            exact_count=(
+                request.query_params.get(self.count_query_param) == 'exact'
+            ),
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+
+class KeysetOptInPagination(CachedCountPagination):
+    """Постраничная пагинация с курсорным режимом по параметру `cursor`.
+
+    Без параметра ответ прежний: `count`, `next`, `previous`, `results`.
+    С `?cursor=` страницы выбираются по ключу сортировки без OFFSET и
+    COUNT(*), а ссылки `next`/`previous` несут закодированный курсор.
+    """
+
+    cursor_query_param = 'cursor'
+    ordering = ('pk',)
+
+    def get_cursor_paginator(self):
+        paginator = CursorPagination()
+        paginator.ordering = self.ordering
+        paginator.page_size = self.page_size
+        paginator.cursor_query_param = self.cursor_query_param
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            self.cursor_paginator = self.get_cursor_paginator()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        self.cursor_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class TitlePagination(KeysetOptInPagination):
+    ordering = ('pk',)
+
+
+class ReviewPagination(KeysetOptInPagination):
+    ordering = ('-pub_date', '-pk')
+
+
+class CommentPagination(KeysetOptInPagination):
+    ordering = ('pk',)
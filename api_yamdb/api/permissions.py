@@ -14,6 +14,9 @@ class IsAdminOrReadOnly(BasePermission):
 
 
 class IsOwnerOrModeratorOrReadOnly(BasePermission):
+    """Автор сравнивается по author_id, а роль берётся из токена:
+    проверка объекта не обращается к базе."""
+
     def has_permission(self, request, view):
         return (
             request.method in SAFE_METHODS
@@ -26,7 +29,7 @@ class IsOwnerOrModeratorOrReadOnly(BasePermission):
             or (
                 request.user.is_authenticated
                 and (
-                    obj.author == request.user
+                    obj.author_id == request.user.pk
                     or request.user.is_moderator
                     or request.user.is_admin
                 )
@@ -34,6 +37,18 @@ class IsOwnerOrModeratorOrReadOnly(BasePermission):
         )
 
 
+class IsModeratorOrAdmin(BasePermission):
+
+    def has_permission(self, request, view):
+        return (
+            request.user.is_authenticated
+            and (
+                request.user.is_moderator
+                or request.user.is_admin
+                or request.user.is_superuser)
+        )
+
+
 class AuthorOrAdmin(BasePermission):
 
     def has_permission(self, request, view):
@@ -46,7 +61,7 @@ class AuthorOrAdmin(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return (
-            obj == request.user
+            obj.pk == request.user.pk
             or request.user.is_superuser
             or request.user.is_admin
         )
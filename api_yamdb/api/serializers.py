@@ -1,11 +1,26 @@
+from django.conf import settings
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db.models import Q
 from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.titles import bulk_create_titles
 from .constants import CHECK_AT_EXISTING
+from .middleware import serializer_timer
 
 
-class UserSerializer(serializers.ModelSerializer):
+class TimedRepresentationMixin:
+    """Учитывает время to_representation в замерах запроса."""
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+class UserSerializer(TimedRepresentationMixin,
+                     serializers.ModelSerializer):
 
     class Meta:
         model = User
@@ -19,7 +34,8 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedRepresentationMixin,
+                      serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = (
@@ -28,7 +44,8 @@ class GenreSerializer(serializers.ModelSerializer):
         )
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedRepresentationMixin,
+                         serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = (
@@ -71,7 +88,89 @@ class TitleSerializer(serializers.ModelSerializer):
         return serializer.data
 
 
-class TitleViewSerializer(serializers.ModelSerializer):
+class TitleBulkListSerializer(serializers.ListSerializer):
+    """Пакет произведений: слаги жанров и категорий всех элементов
+    разрешаются одним запросом на модель, ошибки выдаются списком
+    по элементам пакета."""
+
+    def to_internal_value(self, data):
+        limit = settings.TITLES_BULK_CREATE_LIMIT
+        if isinstance(data, list) and len(data) > limit:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Не больше {limit} произведений за запрос.'
+                ]
+            })
+        if not isinstance(data, list) or not data:
+            return super().to_internal_value(data)
+        items, errors = [], []
+        for item in data:
+            try:
+                items.append(self.child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                items.append(None)
+                errors.append(exc.detail)
+        self.resolve_slugs(items, errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    def resolve_slugs(self, items, errors):
+        """Заменяет слаги прошедших проверку элементов объектами."""
+        valid = [item for item in items if item is not None]
+        categories = Category.objects.in_bulk(
+            {item['category'] for item in valid}, field_name='slug'
+        )
+        genres = Genre.objects.in_bulk(
+            {slug for item in valid for slug in item.get('genre', ())},
+            field_name='slug',
+        )
+        does_not_exist = serializers.SlugRelatedField.default_error_messages[
+            'does_not_exist'
+        ]
+        for item, error in zip(items, errors):
+            if item is None:
+                continue
+            slugs = (
+                ('category', [item['category']], categories),
+                ('genre', item.get('genre', []), genres),
+            )
+            for field, values, found in slugs:
+                unknown = [slug for slug in values if slug not in found]
+                if unknown:
+                    error[field] = [
+                        does_not_exist.format(slug_name='slug', value=slug)
+                        for slug in unknown
+                    ]
+            if not error:
+                item['category'] = categories[item['category']]
+                item['genre'] = [
+                    genres[slug]
+                    for slug in dict.fromkeys(item.get('genre', ()))
+                ]
+
+    def create(self, validated_data):
+        genres = [item.pop('genre') for item in validated_data]
+        return bulk_create_titles(
+            [Title(**item) for item in validated_data], genres
+        )
+
+
+class TitleBulkSerializer(TitleSerializer):
+    """Элемент пакета: слаги проверяются всем пакетом сразу."""
+
+    category = serializers.SlugField()
+    genre = serializers.ListField(
+        child=serializers.SlugField(), required=False
+    )
+
+    class Meta(TitleSerializer.Meta):
+        list_serializer_class = TitleBulkListSerializer
+
+
+class TitleViewSerializer(TimedRepresentationMixin,
+                          serializers.ModelSerializer):
     category = CategorySerializer(many=False, required=True)
     genre = GenreSerializer(many=True, required=False)
     rating = serializers.IntegerField(read_only=True, default=0)
@@ -99,12 +198,24 @@ class TitleViewSerializer(serializers.ModelSerializer):
 
 
 class SignUpSerializer(serializers.ModelSerializer):
+    """Регистрация или повторный запрос кода.
+
+    Занятость username и email проверяется одним запросом в validate, а
+    не отдельными UniqueValidator для каждого поля.
+    """
+
+    registered_user = None
+
     class Meta:
         model = User
         fields = (
             'username',
             'email',
         )
+        extra_kwargs = {
+            'username': {'validators': [UnicodeUsernameValidator()]},
+            'email': {'validators': []},
+        }
 
     def validate_username(self, username):
         if username == 'me' or username == 'Me':
@@ -117,13 +228,56 @@ class SignUpSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Email must have "@"!')
         return email
 
+    def validate(self, data):
+        self.registered_user = self.find_registered_user(
+            data['username'], data['email']
+        )
+        return data
+
+    def find_registered_user(self, username, email):
+        """Пользователь с теми же username и email либо None.
+
+        Если username или email заняты другим пользователем, поднимается
+        ValidationError.
+        """
+        same_username = same_email = None
+        for candidate in User.objects.filter(
+            Q(username=username) | Q(email=email)
+        )[:2]:
+            if candidate.username == username:
+                same_username = candidate
+            if candidate.email == email:
+                same_email = candidate
+        if same_username is not None and same_username == same_email:
+            return same_username
+        errors = {}
+        if same_email is not None:
+            errors['email'] = [email]
+        if same_username is not None:
+            errors['username'] = [username]
+        if errors:
+            raise serializers.ValidationError(errors)
+        return None
+
 
 class ConfirmationSerializer(serializers.Serializer):
     username = serializers.CharField()
     confirmation_code = serializers.CharField()
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class ModerationSerializer(serializers.Serializer):
+    """Идентификаторы объектов для массовой модерации."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.MODERATION_BATCH_LIMIT,
+    )
+    hidden = serializers.BooleanField(default=True)
+
+
+class CommentSerializer(TimedRepresentationMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username')
 
@@ -132,7 +286,8 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedRepresentationMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username',
         default=serializers.CurrentUserDefault())
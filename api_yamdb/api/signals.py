@@ -0,0 +1,120 @@
+from django.apps import apps
+from django.core.signals import request_finished, request_started
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_migrate, post_save)
+from django.dispatch import receiver
+
+from reviews.models import (CommentSearchEntry, ConfirmationCode, GenreTitle,
+                            ModelVersion, OutgoingEmail, ReviewSearchEntry,
+                            TitleSearchEntry, User)
+from reviews.signals import models_bulk_changed
+from .authentication import (USER_CLAIMS, loaded_claims,
+                             revoke_user_claims)
+from .cache import (bump_model_version, bump_model_versions,
+                    finish_request_versions, start_request_versions)
+from .suggest import SUGGEST_MODELS, suggest_index
+
+TRACKED_APP_LABEL = 'reviews'
+# Связи жанров удаляются каскадом вместе с жанром или произведением либо
+# через m2m_changed. Без приёмника post_delete Django удаляет их одним
+# запросом, не загружая строки.
+CASCADE_ONLY_MODELS = (GenreTitle,)
+# Очередь писем и коды подтверждения не участвуют в ответах API, а
+# версии моделей и строки поискового индекса меняются в обход сигналов.
+UNTRACKED_MODELS = (
+    CommentSearchEntry, ConfirmationCode, ModelVersion, OutgoingEmail,
+    ReviewSearchEntry, TitleSearchEntry,
+)
+
+request_started.connect(start_request_versions)
+request_finished.connect(finish_request_versions)
+
+
+def bump_version_on_write(sender, instance, signal, **kwargs):
+    # После удаления Django обнуляет pk, поэтому он запоминается сразу.
+    pk = instance.pk
+
+    def bump():
+        if sender not in SUGGEST_MODELS:
+            bump_model_versions([sender])
+            return
+        suggest_index.apply(
+            sender, pk, instance, signal is post_delete,
+            bump_model_version(sender)
+        )
+    transaction.on_commit(bump)
+
+
+for model in apps.get_app_config(TRACKED_APP_LABEL).get_models():
+    if model in UNTRACKED_MODELS:
+        continue
+    post_save.connect(bump_version_on_write, sender=model)
+    if model not in CASCADE_ONLY_MODELS:
+        post_delete.connect(bump_version_on_write, sender=model)
+
+
+@receiver(m2m_changed)
+def bump_version_on_m2m_change(sender, action, **kwargs):
+    if (
+        sender._meta.app_label != TRACKED_APP_LABEL
+        or not action.startswith('post_')
+    ):
+        return
+    transaction.on_commit(lambda: bump_model_versions([sender]))
+
+
+@receiver(models_bulk_changed)
+def bump_version_on_bulk_change(sender, models, **kwargs):
+    def bump():
+        bump_model_versions(models)
+        suggest_index.invalidate(models)
+    transaction.on_commit(bump)
+
+
+@receiver(post_migrate)
+def bump_version_on_migrate(sender, **kwargs):
+    # migrate и flush меняют данные в обход сигналов моделей.
+    if sender.label != TRACKED_APP_LABEL:
+        return
+    try:
+        # flush не передаёт состояние миграций.
+        kwargs.get('apps', apps).get_model(TRACKED_APP_LABEL, 'ModelVersion')
+    except LookupError:
+        # Откат миграций до появления таблицы версий.
+        return
+    bump_model_versions([
+        model for model in sender.get_models()
+        if model not in UNTRACKED_MODELS
+    ])
+    suggest_index.invalidate(SUGGEST_MODELS)
+    revoke_user_claims()
+
+
+@receiver(post_init, sender=User)
+def remember_claims(sender, instance, **kwargs):
+    instance._loaded_claims = loaded_claims(instance)
+
+
+# Версия claims сдвигается в той же транзакции, что и запись
+# пользователя: откат изменения откатывает и отзыв токенов.
+@receiver(post_save, sender=User)
+def revoke_claims_on_save(sender, instance, created, update_fields,
+                          **kwargs):
+    saved = instance._loaded_claims
+    instance._loaded_claims = loaded_claims(instance)
+    # Новый пользователь ещё не получал токенов.
+    if created:
+        return
+    if update_fields is not None and not set(update_fields) & set(
+        USER_CLAIMS
+    ):
+        return
+    # Поле, не загруженное в объект, могло измениться.
+    if saved != instance._loaded_claims:
+        revoke_user_claims(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_claims_on_delete(sender, instance, **kwargs):
+    revoke_user_claims(instance.pk)
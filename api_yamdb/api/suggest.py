@@ -0,0 +1,161 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+
+from reviews.models import Category, Genre, Title
+from .cache import get_model_versions
+
+SUGGEST_MODELS = {
+    Title: ('title', 'id'),
+    Genre: ('genre', 'slug'),
+    Category: ('category', 'slug'),
+}
+
+
+def normalize(text):
+    return ' '.join(text.lower().replace('ё', 'е').split())
+
+
+def name_keys(name):
+    """Ключи для поиска по началу названия и по началу каждого слова."""
+    words = normalize(name).split(' ')
+    return [' '.join(words[position:]) for position in range(len(words))]
+
+
+class SuggestIndex:
+    """Префиксный индекс названий произведений, жанров и категорий.
+
+    Ключи хранятся в отсортированном списке, поиск по префиксу — два
+    bisect. Изменения в своём процессе применяются по сигналам. Версии
+    моделей общие для процессов и хранятся в базе: модель, версия которой
+    разошлась с индексом (например, после записи в другом процессе),
+    перечитывается целиком. Чтение из базы идёт вне блокировки, под ней
+    только подменяются записи этой модели.
+
+    Версии сверяются с базой не чаще раза в
+    SUGGEST_VERSION_CHECK_INTERVAL секунд, поэтому обращения между
+    проверками не идут в базу, а запись другого процесса попадает в
+    подсказки с такой задержкой. Массовые изменения в своём процессе
+    сбрасывают версию модели через invalidate и видны сразу.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = []
+        self.items = {}
+        self.versions = {}
+        self.checked = None
+
+    def check_due(self):
+        with self.lock:
+            if any(model not in self.versions for model in SUGGEST_MODELS):
+                return True
+        return (
+            self.checked is None
+            or time.monotonic() - self.checked
+            >= settings.SUGGEST_VERSION_CHECK_INTERVAL
+        )
+
+    def invalidate(self, models):
+        """Сбрасывает версии models: они перечитаются при обращении."""
+        with self.lock:
+            for model in models:
+                self.versions.pop(model, None)
+
+    def stale_models(self):
+        """Модели, версии которых разошлись с индексом, и их версии."""
+        versions = dict(zip(
+            SUGGEST_MODELS, get_model_versions(SUGGEST_MODELS)
+        ))
+        self.checked = time.monotonic()
+        return {
+            model: version for model, version in versions.items()
+            if self.versions.get(model) != version
+        }
+
+    def refresh(self, versions):
+        """Перечитывает из базы модели versions и подменяет их записи.
+
+        Версии читаются раньше строк: запись между ними оставит в индексе
+        старую версию, и модель перечитается при следующем обращении.
+        """
+        rows = {
+            model: list(model.objects.values_list(
+                'pk', 'name', SUGGEST_MODELS[model][1]
+            ))
+            for model in versions
+        }
+        kinds = {SUGGEST_MODELS[model][0] for model in versions}
+        with self.lock:
+            self.entries = [
+                entry for entry in self.entries if entry[1] not in kinds
+            ]
+            self.items = {
+                key: value for key, value in self.items.items()
+                if key[0] not in kinds
+            }
+            for model, model_rows in rows.items():
+                for pk, name, value in model_rows:
+                    self.add(model, pk, name, value)
+            self.entries.sort()
+            self.versions.update(versions)
+
+    def add(self, model, pk, name, value, keep_sorted=False):
+        kind, identifier = SUGGEST_MODELS[model]
+        item = {'type': kind, identifier: value, 'name': name}
+        keys = [(key, kind, pk) for key in name_keys(name)]
+        self.items[kind, pk] = (item, keys)
+        for entry in keys:
+            if keep_sorted:
+                insort(self.entries, entry)
+            else:
+                self.entries.append(entry)
+
+    def remove(self, model, pk):
+        kind, _ = SUGGEST_MODELS[model]
+        _, keys = self.items.pop((kind, pk), (None, ()))
+        for entry in keys:
+            position = bisect_left(self.entries, entry)
+            if self.entries[position:position + 1] == [entry]:
+                del self.entries[position]
+
+    def apply(self, model, pk, instance, deleted, version):
+        """Применяет изменение объекта, зафиксированное версией version."""
+        with self.lock:
+            if model not in self.versions:
+                return
+            self.remove(model, pk)
+            if not deleted:
+                _, identifier = SUGGEST_MODELS[model]
+                self.add(
+                    model, pk, instance.name,
+                    getattr(instance, identifier), keep_sorted=True
+                )
+            if self.versions[model] == version - 1:
+                self.versions[model] = version
+            else:
+                del self.versions[model]
+
+    def suggest(self, query, limit):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        if self.check_due():
+            stale = self.stale_models()
+            if stale:
+                self.refresh(stale)
+        with self.lock:
+            found = {}
+            position = bisect_left(self.entries, (prefix,))
+            while len(found) < limit and position < len(self.entries):
+                key, kind, pk = self.entries[position]
+                if not key.startswith(prefix):
+                    break
+                found.setdefault((kind, pk), self.items[kind, pk][0])
+                position += 1
+        return list(found.values())
+
+
+suggest_index = SuggestIndex()
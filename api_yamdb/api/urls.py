@@ -1,8 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (AuthenticationViewset, CategoriesViewSet, CommentViewSet,
-                    GenresViewSet, ReviewViewSet, TitlesViewSet, UserViewSet)
+from .views import (AuthenticationViewset, CategoriesViewSet,
+                    CommentModerationViewSet, CommentViewSet, GenresViewSet,
+                    ReviewModerationViewSet, ReviewViewSet, SlowRequestsView,
+                    TitlesViewSet, UserViewSet)
 
 v1_router = DefaultRouter()
 v1_router.register('users', UserViewSet)
@@ -20,7 +22,20 @@ v1_router.register(
     CommentViewSet,
     basename='comments',
 )
+v1_router.register(
+    'moderation/reviews', ReviewModerationViewSet,
+    basename='moderation-reviews',
+)
+v1_router.register(
+    'moderation/comments', CommentModerationViewSet,
+    basename='moderation-comments',
+)
 
 urlpatterns = [
+    path(
+        'v1/debug/slow-requests/',
+        SlowRequestsView.as_view(),
+        name='slow-requests',
+    ),
     path('v1/', include(v1_router.urls)),
 ]
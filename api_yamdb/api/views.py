@@ -1,36 +1,54 @@
-import secrets
+import json
+import time
 
 from django.conf import settings
-from django.contrib.auth.hashers import check_password
+from django.contrib.auth.hashers import make_password
 from django.core.exceptions import ValidationError
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, OperationalError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import MethodNotAllowed
 from rest_framework.filters import SearchFilter
 from rest_framework.generics import get_object_or_404
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt import tokens
-
-from .filters import TitleFilter
-from .mixins import ReviewsModelMixin
-from reviews.models import Category, Genre, Title, User
+from rest_framework.views import APIView
+from rest_framework.utils.encoders import JSONEncoder
+
+from .authentication import access_token_for
+from .confirmation import issue_code, redeem_code
+from .filters import FullTextSearchFilter, TitleFilter
+from .metrics import collector
+from .middleware import slow_requests
+from .outbox import enqueue_email, queue_depth
+from .mixins import (BulkModerationMixin, CachedDetailResponseMixin,
+                     ConditionalDetailResponseMixin, RelatedPlanMixin,
+                     ReviewsModelMixin)
+from .pagination import (CachedCountPagination, CommentPagination,
+                         ReviewPagination, TitlePagination)
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User)
+from reviews.moderation import (delete_comments, delete_reviews,
+                                hide_comments, hide_reviews)
+from reviews.ratings import apply_review_delta, rebuild_ratings
+from reviews.signals import models_bulk_changed
 from .permissions import (AuthorOrAdmin, IsAdminOrReadOnly,
                           IsOwnerOrModeratorOrReadOnly)
 from .serializers import (CategorySerializer, CommentSerializer,
                           ConfirmationSerializer, GenreSerializer,
-                          ReviewSerializer, SignUpSerializer, TitleSerializer,
-                          TitleViewSerializer, UserSerializer)
+                          ModerationSerializer, ReviewSerializer,
+                          SignUpSerializer, TitleBulkSerializer,
+                          TitleSerializer, TitleViewSerializer,
+                          UserSerializer)
+from .suggest import suggest_index
 
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all().order_by('pk')
     serializer_class = UserSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = CachedCountPagination
     permission_classes = (AuthorOrAdmin,)
     filter_backends = (SearchFilter,)
     lookup_field = 'username'
@@ -38,6 +56,17 @@ class UserViewSet(viewsets.ModelViewSet):
     search_fields = ('username',)
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def perform_destroy(self, instance):
+        # Отзывы пользователя удаляются каскадом, без пересчёта рейтинга
+        # в ReviewViewSet: агрегаты их произведений пересчитываются здесь.
+        with transaction.atomic():
+            title_ids = list(Review.objects.filter(
+                author=instance
+            ).order_by().values_list('title_id', flat=True).distinct())
+            instance.delete()
+            if title_ids:
+                rebuild_ratings(Title.objects.filter(pk__in=title_ids))
+
     @action(
         detail=False,
         methods=['get', 'patch'],
@@ -45,7 +74,7 @@ class UserViewSet(viewsets.ModelViewSet):
         url_path='me',
     )
     def about_me(self, request):
-        user = get_object_or_404(User, username=self.request.user)
+        user = get_object_or_404(User, pk=self.request.user.pk)
         if request.method == 'GET':
             serializer = UserSerializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -57,31 +86,72 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class SlowRequestsView(APIView):
+    """Самые медленные запросы процесса вместе с их SQL."""
+
+    permission_classes = (AuthorOrAdmin,)
+
+    def get(self, request):
+        return Response({'results': slow_requests()})
+
+
+def metrics_view(request):
+    """Метрики всех процессов приложения для Prometheus."""
+    for email_status, depth in queue_depth().items():
+        collector.set(
+            'yamdb_email_queue_depth', {'status': email_status}, depth
+        )
+    return HttpResponse(
+        collector.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
 class GenresViewSet(ReviewsModelMixin):
     queryset = Genre.objects.all().order_by('pk')
     serializer_class = GenreSerializer
+    cache_models = (Genre,)
 
 
 class CategoriesViewSet(ReviewsModelMixin):
     queryset = Category.objects.all().order_by('pk')
     serializer_class = CategorySerializer
-
-
-class TitlesViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('pk')
+    cache_models = (Category,)
+
+    def perform_destroy(self, instance):
+        # Одним UPDATE вместо загрузки и пакетного обновления всех
+        # произведений категории сборщиком удаления.
+        with transaction.atomic():
+            detached = Title.objects.filter(category=instance).update(
+                category=None
+            )
+            instance.delete()
+        if detached:
+            models_bulk_changed.send(sender=Title, models=[Title])
+
+
+class TitlesViewSet(
+    ConditionalDetailResponseMixin,
+    CachedDetailResponseMixin,
+    RelatedPlanMixin,
+    viewsets.ModelViewSet
+):
+    queryset = Title.objects.all().order_by('pk')
     serializer_class = TitleSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter)
     filterset_class = TitleFilter
-    pagination_class = PageNumberPagination
+    pagination_class = TitlePagination
+    cache_models = (Title, Genre, Category, GenreTitle, Review)
 
     def update(self, request, *args, **kwargs):
         raise MethodNotAllowed(request.method)
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve',):
+        if self.action in ('list', 'retrieve', 'export'):
             return TitleViewSerializer
+        if self.action == 'bulk_create':
+            return TitleBulkSerializer
         return TitleSerializer
 
     def partial_update(self, request, *args, **kwargs):
@@ -92,6 +162,70 @@ class TitlesViewSet(viewsets.ModelViewSet):
         serializer.save()
         return Response(serializer.data)
 
+    def export_lines(self, queryset):
+        """Выдаёт произведения построчно в формате NDJSON.
+
+        Произведения читаются пачками по EXPORT_CHUNK_SIZE по возрастанию
+        первичного ключа; жанры каждой пачки подгружаются одним запросом.
+        """
+        chunk_size = settings.EXPORT_CHUNK_SIZE
+        queryset = queryset.order_by('pk')
+        last_pk = None
+        while True:
+            chunk = queryset if last_pk is None else queryset.filter(
+                pk__gt=last_pk
+            )
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                return
+            serializer = self.get_serializer(chunk, many=True)
+            yield ''.join(
+                json.dumps(item, cls=JSONEncoder, ensure_ascii=False) + '\n'
+                for item in serializer.data
+            )
+            if len(chunk) < chunk_size:
+                return
+            last_pk = chunk[-1].pk
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False
+        )
+        serializer.is_valid(raise_exception=True)
+        try:
+            titles = serializer.save()
+        except IntegrityError:
+            return Response(
+                {'detail': 'Пакет конфликтует с параллельной записью, '
+                           'повторите запрос.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        created = Title.objects.filter(
+            pk__in=[title.pk for title in titles]
+        ).select_related('category').prefetch_related('genre').order_by('pk')
+        return Response(
+            TitleViewSerializer(created, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=['get'], url_path='suggest')
+    def suggest(self, request):
+        return Response({'results': suggest_index.suggest(
+            request.query_params.get('q', ''), settings.SUGGEST_LIMIT
+        )})
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        return self.conditional_response(self.stream_export, request)
+
+    def stream_export(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self.export_lines(queryset),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+
     def handle_exception(self, exc):
         if isinstance(exc, MethodNotAllowed):
             return Response(
@@ -104,20 +238,49 @@ class TitlesViewSet(viewsets.ModelViewSet):
         return super().handle_exception(exc)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ConditionalDetailResponseMixin,
+    RelatedPlanMixin,
+    BulkModerationMixin,
+    viewsets.ModelViewSet
+):
     serializer_class = ReviewSerializer
     permission_classes = [IsOwnerOrModeratorOrReadOnly]
+    filter_backends = (FullTextSearchFilter,)
+    pagination_class = ReviewPagination
+    cache_models = (Review, Title, User)
+    delete_moderated = staticmethod(delete_reviews)
+    hide_moderated = staticmethod(hide_reviews)
 
     def get_title(self):
         return get_object_or_404(Title, id=self.kwargs.get('title_id'))
 
     def get_queryset(self):
         title = self.get_title()
-        return title.reviews.all()
+        return self.plan_queryset(title.reviews.filter(is_hidden=False))
+
+    def moderation_queryset(self):
+        # Модератор может вернуть скрытые отзывы, поэтому они не
+        # исключаются; произведение отдельным запросом не проверяется.
+        return Review.objects.filter(title_id=self.kwargs.get('title_id'))
 
     def perform_create(self, serializer):
         title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
+        with transaction.atomic():
+            review = serializer.save(author=self.request.user, title=title)
+            apply_review_delta(title.pk, review.score, 1)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            old_score = Review.objects.select_for_update().values_list(
+                'score', flat=True).get(pk=serializer.instance.pk)
+            review = serializer.save()
+            apply_review_delta(review.title_id, review.score - old_score)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            apply_review_delta(instance.title_id, -instance.score, -1)
 
     def update(self, request, *args, **kwargs):
         return Response(
@@ -129,26 +292,41 @@ class ReviewViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(
             instance, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        self.perform_update(serializer)
         return Response(serializer.data)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ConditionalDetailResponseMixin,
+    RelatedPlanMixin,
+    BulkModerationMixin,
+    viewsets.ModelViewSet
+):
     serializer_class = CommentSerializer
     permission_classes = [IsOwnerOrModeratorOrReadOnly]
+    filter_backends = (FullTextSearchFilter,)
+    pagination_class = CommentPagination
+    cache_models = (Comment, Review, User)
+    delete_moderated = staticmethod(delete_comments)
+    hide_moderated = staticmethod(hide_comments)
 
     def get_review(self):
         title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        try:
-            review = title.reviews.get(id=self.kwargs.get('review_id'))
-        except TypeError:
-            TypeError('У произведения нет такого отзыва')
-        return review
+        return get_object_or_404(
+            title.reviews.filter(is_hidden=False),
+            id=self.kwargs.get('review_id'),
+        )
 
     def get_queryset(self):
         title = self.get_review()
-        queryset = title.comments.all().order_by('pk')
-        return queryset
+        queryset = title.comments.filter(is_hidden=False).order_by('pk')
+        return self.plan_queryset(queryset)
+
+    def moderation_queryset(self):
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+        )
 
     def perform_create(self, serializer):
         review = self.get_review()
@@ -168,13 +346,30 @@ class CommentViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
+class ReviewModerationViewSet(BulkModerationMixin, viewsets.GenericViewSet):
+    """Массовая модерация отзывов любых произведений."""
+
+    queryset = Review.objects.all()
+    serializer_class = ModerationSerializer
+    delete_moderated = staticmethod(delete_reviews)
+    hide_moderated = staticmethod(hide_reviews)
+
+
+class CommentModerationViewSet(BulkModerationMixin, viewsets.GenericViewSet):
+    """Массовая модерация комментариев к любым отзывам."""
+
+    queryset = Comment.objects.all()
+    serializer_class = ModerationSerializer
+    delete_moderated = staticmethod(delete_comments)
+    hide_moderated = staticmethod(hide_comments)
+
+
 class AuthenticationViewset(viewsets.GenericViewSet):
     def send_confirmation_email(self, email, confirmation_code):
         subject = 'Confirmation Code for YourApp'
         message = f'Your confirmation code is: {confirmation_code}'
         from_email = settings.DEFAULT_FROM_EMAIL
-        recipient_list = [email]
-        send_mail(subject, message, from_email, recipient_list)
+        enqueue_email(subject, message, from_email, email)
 
     @action(
         methods=['POST'],
@@ -184,52 +379,45 @@ class AuthenticationViewset(viewsets.GenericViewSet):
         permission_classes=(AllowAny,)
     )
     def signup(self, request):
-        serializer = SignUpSerializer(data=request.data)
-        existing_user = User.objects.filter(
-            username=request.data.get('username')
-        ).first()
-        existing_mail = User.objects.filter(
-            email=request.data.get('email')
-        ).first()
-        if existing_user or existing_mail:
-            email = request.data.get('email')
-            confirmation_code = secrets.token_hex(6)
-            if not existing_user:
-                return Response(
-                    {'email': [email, ]},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            if not existing_mail:
-                return Response(
-                    {'username': [existing_user.username, ]},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            if email == existing_user.email:
-                existing_user.set_password(confirmation_code)
-                existing_user.save()
-                self.send_confirmation_email(
-                    existing_user.email,
-                    confirmation_code
-                )
-                return Response({
-                    'email': existing_user.email,
-                    'username': existing_user.username
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response(
-                    {'email': [email, ],
-                     'username': [existing_user.username, ]},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        # Параллельная запись может заблокировать таблицу (SQLite
+        # отвечает «database table is locked»): регистрация повторяется
+        # целиком, а если база так и не освободилась — ответ 503.
+        for attempt in range(settings.SIGNUP_LOCK_RETRIES):
+            try:
+                return self.register(request)
+            except OperationalError:
+                if transaction.get_connection().in_atomic_block:
+                    raise
+                time.sleep(0.01 * 2 ** attempt)
+        return Response(
+            {'detail': 'База данных занята, повторите запрос позже.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': '1'},
+        )
 
+    def register(self, request):
+        serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        confirmation_code = secrets.token_hex(6)
-        username = serializer.validated_data.get('username')
-        email = serializer.validated_data.get('email')
-
-        user = User.objects.create(username=username, email=email)
-        user.set_password(confirmation_code)
-        user.save()
+        username = serializer.validated_data['username']
+        email = serializer.validated_data['email']
+
+        user = serializer.registered_user
+        if user is None:
+            try:
+                with transaction.atomic():
+                    user = User.objects.create(
+                        username=username, email=email,
+                        password=make_password(None)
+                    )
+                    confirmation_code = issue_code(user, new_user=True)
+            except IntegrityError:
+                # Параллельный запрос успел занять username или email.
+                user = serializer.find_registered_user(username, email)
+                if user is None:
+                    raise
+                confirmation_code = issue_code(user)
+        else:
+            confirmation_code = issue_code(user)
 
         self.send_confirmation_email(user.email, confirmation_code)
 
@@ -250,12 +438,11 @@ class AuthenticationViewset(viewsets.GenericViewSet):
         if serializer.is_valid():
             username = serializer.validated_data['username']
             confirmation_code = serializer.validated_data['confirmation_code']
-            user = get_object_or_404(User, username=username)
+            user = redeem_code(username, confirmation_code)
 
-            if check_password(confirmation_code, user.password):
-                refresh = tokens.RefreshToken.for_user(user)
+            if user is not None:
                 return Response(
-                    {'token': f'{refresh.access_token}'},
+                    {'token': f'{access_token_for(user)}'},
                     status=status.HTTP_200_OK
                 )
 
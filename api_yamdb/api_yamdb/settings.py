@@ -1,3 +1,4 @@
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 from django.core.management.utils import get_random_secret_key
@@ -23,10 +24,12 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'django_filters',
     'api',
-    'reviews'
+    'reviews',
+    'benchmark',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,6 +69,13 @@ DATABASES = {
 }
 
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -87,13 +97,13 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = (BASE_DIR / 'mail/')
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CachedCountPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -116,6 +126,41 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+PAGINATION_COUNT_TIMEOUT = 60
+RESPONSE_CACHE_TIMEOUT = 300
+EXPORT_CHUNK_SIZE = 500
+SUGGEST_LIMIT = 10
+SUGGEST_VERSION_CHECK_INTERVAL = 1
+SLOW_REQUESTS_KEPT = 20
+SLOW_REQUEST_MAX_SQL = 50
+METRICS_DIR = Path(tempfile.gettempdir()) / 'yamdb-metrics'
+METRICS_FLUSH_INTERVAL = 5
+EMAIL_QUEUE_BATCH_SIZE = 100
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+EMAIL_QUEUE_RETRY_DELAY = 60
+EMAIL_QUEUE_LEASE = 300
+EMAIL_QUEUE_FAILED_TTL = 7 * 24 * 60 * 60
+CONFIRMATION_CODE_TTL = 24 * 60 * 60
+CONFIRMATION_CODE_MAX_ATTEMPTS = 5
+SIGNUP_LOCK_RETRIES = 5
+TOKEN_USER_CACHE_SIZE = 10000
+MODERATION_BATCH_LIMIT = 500
+TITLES_BULK_CREATE_LIMIT = 500
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.requests': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
 
 STATIC_URL = '/static/'
 
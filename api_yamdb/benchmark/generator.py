@@ -0,0 +1,169 @@
+import random
+from bisect import bisect
+from collections import Counter
+from itertools import accumulate
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from reviews.csv_data import DEFAULT_BATCH_SIZE, batches
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User)
+from reviews.ratings import rebuild_ratings
+from reviews.search import rebuild_search_index
+from reviews.signals import models_bulk_changed
+
+DEFAULT_SEED = 42
+DEFAULT_EXPONENT = 1.1
+MAX_GENRES_PER_TITLE = 3
+CATEGORY_NAMES = ('Фильм', 'Книга', 'Музыка', 'Сериал', 'Игра')
+GENRE_NAMES = (
+    'Драма', 'Комедия', 'Ужасы', 'Фантастика', 'Детектив', 'Триллер',
+    'Приключения', 'Мелодрама', 'Документальный', 'Сказка', 'Рок',
+    'Классика',
+)
+WORDS = (
+    'война', 'мир', 'любовь', 'время', 'город', 'ночь', 'дорога', 'море',
+    'король', 'тайна', 'звезда', 'сердце', 'история', 'жизнь', 'песня',
+    'отличный', 'скучный', 'сильный', 'странный', 'великий', 'последний',
+)
+
+
+class ZipfSampler:
+    """Выбирает номер от 0 до size - 1 с вероятностью, обратно
+    пропорциональной (номер + 1) ** exponent."""
+
+    def __init__(self, size, exponent, rng):
+        self.rng = rng
+        self.cum_weights = list(accumulate(
+            1 / rank ** exponent for rank in range(1, size + 1)
+        ))
+
+    def __call__(self):
+        return bisect(
+            self.cum_weights, self.rng.random() * self.cum_weights[-1]
+        )
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def insert(model, objects, batch_size):
+    created = 0
+    for batch in batches(objects, batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=batch_size)
+        created += len(batch)
+    return created
+
+
+def review_counts(titles, reviews, authors, exponent, rng):
+    """Распределяет отзывы по произведениям по закону Ципфа.
+
+    У одного произведения не больше отзывов, чем авторов: каждый
+    пользователь оставляет к произведению только один отзыв.
+    """
+    sampler = ZipfSampler(titles, exponent, rng)
+    counts = Counter(sampler() for _ in range(reviews))
+    return [min(counts[rank], authors) for rank in range(titles)]
+
+
+def generate_dataset(users, titles, reviews, comments, genres=None,
+                     categories=None, exponent=DEFAULT_EXPONENT,
+                     seed=DEFAULT_SEED, batch_size=DEFAULT_BATCH_SIZE):
+    """Наполняет базу синтетическими данными и возвращает Counter
+    созданных строк по именам моделей.
+
+    При одинаковых аргументах данные совпадают до первичных ключей:
+    все случайные величины берутся из random.Random(seed). Популярность
+    произведений и отзывов убывает с номером по закону Ципфа, поэтому
+    первые произведения получают большую часть отзывов, а первые отзывы
+    к ним — большую часть комментариев.
+    """
+    rng = random.Random(seed)
+    genres = min(genres or len(GENRE_NAMES), len(GENRE_NAMES))
+    categories = min(categories or len(CATEGORY_NAMES), len(CATEGORY_NAMES))
+    created = Counter()
+
+    first = {
+        model: next_pk(model)
+        for model in (User, Category, Genre, Title, Review)
+    }
+    created['Category'] = insert(Category, (
+        Category(
+            pk=first[Category] + idx, name=CATEGORY_NAMES[idx],
+            slug=f'bench-category-{first[Category] + idx}'
+        )
+        for idx in range(categories)
+    ), batch_size)
+    created['Genre'] = insert(Genre, (
+        Genre(
+            pk=first[Genre] + idx, name=GENRE_NAMES[idx],
+            slug=f'bench-genre-{first[Genre] + idx}'
+        )
+        for idx in range(genres)
+    ), batch_size)
+    created['User'] = insert(User, (
+        User(
+            pk=first[User] + idx, username=f'bench{first[User] + idx}',
+            email=f'bench{first[User] + idx}@yamdb.fake',
+            role='moderator' if idx % 100 == 0 else 'user',
+        )
+        for idx in range(users)
+    ), batch_size)
+    created['Title'] = insert(Title, (
+        Title(
+            pk=first[Title] + idx, name=sentence(rng, rng.randint(1, 4)),
+            year=rng.randint(1900, 2024),
+            category_id=first[Category] + rng.randrange(categories),
+            description=sentence(rng, rng.randint(5, 20)),
+        )
+        for idx in range(titles)
+    ), batch_size)
+    genre_sampler = ZipfSampler(genres, exponent, rng)
+    created['GenreTitle'] = insert(GenreTitle, (
+        GenreTitle(piece_id=first[Title] + idx, genre_id=first[Genre] + genre)
+        for idx in range(titles)
+        for genre in sorted({
+            genre_sampler()
+            for _ in range(rng.randint(1, MAX_GENRES_PER_TITLE))
+        })
+    ), batch_size)
+    counts = review_counts(titles, reviews, users, exponent, rng)
+    created['Review'] = insert(Review, (
+        Review(
+            pk=first[Review] + number, title_id=first[Title] + idx,
+            author_id=first[User] + author, score=rng.randint(1, 10),
+            text=sentence(rng, rng.randint(3, 30)),
+        )
+        for number, (idx, author) in enumerate(
+            (idx, author)
+            for idx, count in enumerate(counts)
+            for author in rng.sample(range(users), count)
+        )
+    ), batch_size)
+    if created['Review']:
+        review_sampler = ZipfSampler(created['Review'], exponent, rng)
+        created['Comment'] = insert(Comment, (
+            Comment(
+                review_id=first[Review] + review_sampler(),
+                author_id=first[User] + rng.randrange(users),
+                text=sentence(rng, rng.randint(2, 15)),
+            )
+            for _ in range(comments)
+        ), batch_size)
+
+    models = [User, Category, Genre, Title, GenreTitle, Review, Comment]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+    rebuild_ratings()
+    rebuild_search_index()
+    models_bulk_changed.send(sender=generate_dataset, models=models)
+    return created
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from benchmark.generator import (DEFAULT_EXPONENT, DEFAULT_SEED,
+                                 generate_dataset)
+from reviews.csv_data import DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу детерминированными синтетическими данными для '
+        'нагрузочного тестирования. Запускайте на отдельной базе.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ('users', 1000, 'Число пользователей.'),
+            ('titles', 10000, 'Число произведений.'),
+            ('reviews', 100000, 'Число отзывов (с учётом ограничения «один '
+                                'отзыв автора на произведение» может '
+                                'получиться меньше).'),
+            ('comments', 100000, 'Число комментариев.'),
+            ('batch-size', DEFAULT_BATCH_SIZE, 'Строк в одной транзакции.'),
+            ('seed', DEFAULT_SEED, 'Начальное значение генератора.'),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default, help=help_text
+            )
+        parser.add_argument(
+            '--exponent',
+            type=float,
+            default=DEFAULT_EXPONENT,
+            help='Показатель распределения Ципфа для популярности.',
+        )
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['titles'], options['batch_size']) < 1:
+            raise CommandError(
+                'Число пользователей, произведений и размер пачки должны '
+                'быть положительными.'
+            )
+        started = time.monotonic()
+        created = generate_dataset(
+            users=options['users'],
+            titles=options['titles'],
+            reviews=options['reviews'],
+            comments=options['comments'],
+            exponent=options['exponent'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        for name, rows in created.items():
+            self.stdout.write(f'{name}: создано {rows} строк')
+        self.stdout.write(self.style.SUCCESS(
+            f'Синтетические данные созданы за '
+            f'{time.monotonic() - started:.2f} с.'
+        ))
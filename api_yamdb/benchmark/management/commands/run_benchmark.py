@@ -0,0 +1,74 @@
+from functools import partial
+
+from django.core.management import BaseCommand, CommandError
+
+from benchmark.generator import DEFAULT_SEED
+from benchmark.workload import (ClientTransport, HttpTransport,
+                                run_workload, summarize)
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет смешанную нагрузку чтения и записи по API и выводит '
+        'пропускную способность и перцентили времени ответа по операциям.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Общее число запросов.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Число потоков, отправляющих запросы.',
+        )
+        parser.add_argument(
+            '--url',
+            help='Адрес запущенного сервера, например http://127.0.0.1:8000. '
+                 'Без него запросы выполняются тестовым клиентом Django. '
+                 'Для записи по HTTP сервер должен использовать тот же '
+                 'SECRET_KEY, что и эта команда.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=DEFAULT_SEED,
+            help='Начальное значение генератора запросов.',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError(
+                'Число запросов и потоков должно быть положительным.'
+            )
+        transport = (
+            partial(HttpTransport, options['url']) if options['url']
+            else ClientTransport
+        )
+        try:
+            results, elapsed = run_workload(
+                transport,
+                options['requests'],
+                concurrency=options['concurrency'],
+                seed=options['seed'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(
+            f'{"операция":<16}{"запросов":>9}{"ошибок":>8}{"отказов":>9}'
+            f'{"rps":>9}{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}'
+        )
+        for row in summarize(results, elapsed):
+            self.stdout.write(
+                f'{row["operation"]:<16}{row["requests"]:>9}'
+                f'{row["errors"]:>8}{row["rejected"]:>9}{row["rps"]:>9.1f}'
+                f'{row["p50"]:>10.2f}{row["p95"]:>10.2f}{row["p99"]:>10.2f}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего {len(results)} запросов за {elapsed:.2f} с '
+            f'({len(results) / elapsed:.1f} запросов/с).'
+        ))
@@ -0,0 +1,216 @@
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import Client
+
+from api.authentication import access_token_for
+from reviews.models import Genre, Review, Title, User
+from .generator import DEFAULT_EXPONENT, DEFAULT_SEED, WORDS, ZipfSampler
+
+TITLES_URL = '/api/v1/titles/'
+CONTEXT_SAMPLE_SIZE = 1000
+AUTHORS_SAMPLE_SIZE = 50
+Operation = namedtuple('Operation', 'name weight method build auth')
+Result = namedtuple('Result', 'operation status seconds')
+
+
+class WorkloadContext:
+    """Идентификаторы объектов, к которым обращается нагрузка.
+
+    Произведения и отзывы выбираются по закону Ципфа в порядке
+    первичных ключей, как их создаёт generate_dataset.
+    """
+
+    def __init__(self, rng, exponent=DEFAULT_EXPONENT,
+                 sample_size=CONTEXT_SAMPLE_SIZE):
+        self.rng = rng
+        self.titles = list(
+            Title.objects.order_by('pk').values_list('pk', flat=True)[
+                :sample_size
+            ]
+        )
+        self.reviews = list(
+            Review.objects.filter(title__in=self.titles).order_by(
+                'title', 'pk'
+            ).values_list('title', 'pk')[:sample_size]
+        )
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        if not self.titles or not self.reviews or not self.genres:
+            raise ValueError(
+                'Для нагрузки нужны произведения, жанры и отзывы: '
+                'запустите generate_benchmark_data.'
+            )
+        self.tokens = [
+            str(access_token_for(user))
+            for user in User.objects.order_by('pk')[:AUTHORS_SAMPLE_SIZE]
+        ]
+        self.title_sampler = ZipfSampler(len(self.titles), exponent, rng)
+        self.review_sampler = ZipfSampler(len(self.reviews), exponent, rng)
+
+    def title(self):
+        return self.titles[self.title_sampler()]
+
+    def review(self):
+        return self.reviews[self.review_sampler()]
+
+    def word(self):
+        return self.rng.choice(WORDS)
+
+    def token(self):
+        return self.rng.choice(self.tokens)
+
+
+def comments_url(context):
+    title, review = context.review()
+    return f'{TITLES_URL}{title}/reviews/{review}/comments/'
+
+
+WORKLOAD = (
+    Operation('titles-list', 20, 'get', lambda context: (
+        f'{TITLES_URL}?page={context.rng.randint(1, 5)}', None
+    ), False),
+    Operation('titles-filter', 10, 'get', lambda context: (
+        f'{TITLES_URL}?genre={context.rng.choice(context.genres)}', None
+    ), False),
+    Operation('titles-detail', 20, 'get', lambda context: (
+        f'{TITLES_URL}{context.title()}/', None
+    ), False),
+    Operation('titles-search', 5, 'get', lambda context: (
+        f'{TITLES_URL}?search={context.word()}', None
+    ), False),
+    Operation('titles-suggest', 10, 'get', lambda context: (
+        f'{TITLES_URL}suggest/?q={context.word()[:3]}', None
+    ), False),
+    Operation('reviews-list', 15, 'get', lambda context: (
+        f'{TITLES_URL}{context.title()}/reviews/', None
+    ), False),
+    Operation('comments-list', 10, 'get', lambda context: (
+        comments_url(context), None
+    ), False),
+    Operation('reviews-create', 5, 'post', lambda context: (
+        f'{TITLES_URL}{context.title()}/reviews/',
+        {'text': f'Отзыв: {context.word()}',
+         'score': context.rng.randint(1, 10)},
+    ), True),
+    Operation('comments-create', 5, 'post', lambda context: (
+        comments_url(context), {'text': f'Комментарий: {context.word()}'}
+    ), True),
+)
+
+
+class ClientTransport:
+    """Выполняет запросы в этом же процессе через django.test.Client."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        if method == 'get':
+            response = self.client.get(path, **headers)
+        else:
+            response = getattr(self.client, method)(
+                path, data, content_type='application/json', **headers
+            )
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response.status_code
+
+
+class HttpTransport:
+    """Выполняет запросы к запущенному серверу по HTTP."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, data=None, token=None):
+        request = urllib.request.Request(
+            self.base_url + urllib.request.quote(path, safe='/?=&'),
+            data=json.dumps(data).encode() if data is not None else None,
+            method=method.upper(),
+            headers={'Content-Type': 'application/json'},
+        )
+        if token:
+            request.add_header('Authorization', f'Bearer {token}')
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+
+
+def plan_requests(context, requests, workload=WORKLOAD):
+    """Заранее выбирает операции и их аргументы, чтобы случайность не
+    зависела от порядка выполнения в потоках."""
+    weights = [operation.weight for operation in workload]
+    plan = []
+    for operation in context.rng.choices(workload, weights, k=requests):
+        path, data = operation.build(context)
+        token = context.token() if operation.auth else None
+        plan.append((operation, path, data, token))
+    return plan
+
+
+def execute(transport, planned):
+    operation, path, data, token = planned
+    started = time.perf_counter()
+    status = transport.request(operation.method, path, data, token)
+    return Result(operation.name, status, time.perf_counter() - started)
+
+
+def run_workload(transport_factory, requests, concurrency=1,
+                 seed=DEFAULT_SEED, workload=WORKLOAD):
+    """Прогоняет смешанную нагрузку и возвращает результаты запросов
+    и общее время в секундах."""
+    context = WorkloadContext(random.Random(seed))
+    plan = plan_requests(context, requests, workload)
+    started = time.perf_counter()
+    if concurrency == 1:
+        transport = transport_factory()
+        results = [execute(transport, planned) for planned in plan]
+    else:
+        local = threading.local()
+
+        def worker(planned):
+            if not hasattr(local, 'transport'):
+                local.transport = transport_factory()
+            return execute(local.transport, planned)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(worker, plan))
+    return results, time.perf_counter() - started
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def summarize(results, elapsed):
+    """Сводка по операциям: число запросов, ошибок, запросов в секунду
+    и перцентили времени ответа в миллисекундах."""
+    grouped = defaultdict(list)
+    for result in results:
+        grouped[result.operation].append(result)
+    rows = []
+    for name, group in sorted(grouped.items()):
+        timings = [result.seconds * 1000 for result in group]
+        rows.append({
+            'operation': name,
+            'requests': len(group),
+            'errors': sum(result.status >= 500 for result in group),
+            'rejected': sum(400 <= result.status < 500 for result in group),
+            'rps': len(group) / elapsed if elapsed else 0,
+            'p50': statistics.median(timings),
+            'p95': percentile(timings, 0.95),
+            'p99': percentile(timings, 0.99),
+        })
+    return rows
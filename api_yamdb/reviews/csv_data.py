@@ -0,0 +1,379 @@
+import csv
+import gzip
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+
+from .models import Category, Comment, Genre, GenreTitle, Review, Title, User
+from .signals import models_bulk_changed
+
+DATA_NAMES = {
+    Category: 'category.csv',
+    Comment: 'comments.csv',
+    Genre: 'genre.csv',
+    GenreTitle: 'genre_title.csv',
+    Review: 'review.csv',
+    Title: 'titles.csv',
+    User: 'users.csv'
+}
+COLUMN_ALIASES = {
+    GenreTitle: {'title_id': 'piece_id'},
+}
+CSV_COLUMNS = {
+    Category: ('id', 'name', 'slug'),
+    Comment: ('id', 'review_id', 'text', 'author', 'pub_date'),
+    Genre: ('id', 'name', 'slug'),
+    GenreTitle: ('id', 'title_id', 'genre_id'),
+    Review: ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    Title: ('id', 'name', 'year', 'category', 'description'),
+    User: ('id', 'username', 'email', 'role', 'bio', 'first_name',
+           'last_name'),
+}
+DEFAULT_BATCH_SIZE = 1000
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+
+def dependency_levels(models):
+    """Разбивает модели на уровни так, чтобы внешние ключи каждой модели
+    ссылались только на модели предыдущих уровней."""
+    models = list(models)
+    dependencies = {
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.many_to_one and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    levels = []
+    loaded = set()
+    while len(loaded) < len(models):
+        level = [
+            model for model in models
+            if model not in loaded and dependencies[model] <= loaded
+        ]
+        if not level:
+            raise ValueError('Циклическая зависимость между моделями.')
+        levels.append(level)
+        loaded.update(level)
+    return levels
+
+
+def load_order(models):
+    return [model for level in dependency_levels(models) for model in level]
+
+
+def column_attnames(model, columns):
+    """Сопоставляет колонкам CSV атрибуты модели.
+
+    Колонка может называться как поле (`author`, `category`) или как его
+    атрибут в базе (`review_id`); для расхождений есть COLUMN_ALIASES.
+    """
+    aliases = COLUMN_ALIASES.get(model, {})
+    attnames = {field.attname: field for field in model._meta.concrete_fields}
+    mapping = {}
+    for column in columns:
+        if column in aliases:
+            mapping[column] = attnames[aliases[column]]
+            continue
+        try:
+            field = model._meta.get_field(column)
+        except FieldDoesNotExist:
+            field = attnames.get(column)
+        if field is None or not field.concrete:
+            raise ValueError(
+                f'В модели {model.__name__} нет поля для колонки {column}.'
+            )
+        mapping[column] = field
+    return mapping
+
+
+def row_values(mapping, row):
+    values = {}
+    for column, field in mapping.items():
+        value = row[column]
+        if value == '' and field.null:
+            value = None
+        values[field.attname] = value
+    return values
+
+
+@contextmanager
+def _dates_from_file(mapping):
+    """Отключает auto_now/auto_now_add у полей, которые есть в файле.
+
+    bulk_create вызывает pre_save полей, и такие поля получили бы текущее
+    время вместо даты из файла.
+    """
+    fields = [
+        (field, field.auto_now, field.auto_now_add)
+        for field in mapping.values()
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    for field, _, _ in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def load_model(model, path, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Потоково загружает CSV в модель пачками по batch_size строк.
+
+    Каждая пачка вставляется одним bulk_create в своей транзакции, поэтому
+    память не растёт с размером файла. Даты auto_now_add берутся из файла.
+    Возвращает число загруженных строк.
+    """
+    loaded = 0
+    started = time.monotonic()
+    with open(path, 'r', encoding='utf-8', newline='') as csv_file:
+        reader = csv.DictReader(csv_file)
+        mapping = column_attnames(model, reader.fieldnames)
+        for batch in batches(reader, batch_size):
+            objects = [model(**row_values(mapping, row)) for row in batch]
+            with transaction.atomic(), _dates_from_file(mapping):
+                model.objects.bulk_create(objects, batch_size=batch_size)
+            loaded += len(objects)
+            if progress is not None:
+                progress(model, loaded, time.monotonic() - started)
+    models_bulk_changed.send(sender=model, models=[model])
+    return loaded
+
+
+def _comparable_fields(mapping):
+    return {
+        column: field for column, field in mapping.items()
+        if not field.primary_key
+        and not getattr(field, 'auto_now', False)
+        and not getattr(field, 'auto_now_add', False)
+    }
+
+
+def _diff_batch(model, mapping, attnames, batch):
+    """Делит пачку строк CSV на новые и изменённые объекты модели."""
+    pk = model._meta.pk
+    rows = {}
+    for row in batch:
+        values = row_values(mapping, row)
+        for field in mapping.values():
+            values[field.attname] = field.to_python(values[field.attname])
+        rows[values[pk.attname]] = values
+    existing = {
+        row[0]: row[1:] for row in model.objects.filter(
+            pk__in=rows
+        ).values_list(pk.attname, *attnames).iterator()
+    }
+    created, changed = [], []
+    for key, values in rows.items():
+        if key not in existing:
+            created.append(model(**values))
+        elif existing[key] != tuple(values[name] for name in attnames):
+            changed.append(model(**values))
+    return created, changed, len(rows)
+
+
+def upsert_model(model, path, batch_size=DEFAULT_BATCH_SIZE, dry_run=False,
+                 progress=None):
+    """Синхронизирует модель с CSV, записывая только отличающиеся строки.
+
+    Для каждой пачки существующие строки выбираются одним запросом по
+    первичным ключам и сравниваются по колонкам файла: новые вставляются
+    через bulk_create, изменённые обновляются через bulk_update, прочие
+    не трогаются. Поля auto_now/auto_now_add не сравниваются. Строки,
+    которых нет в файле, остаются в базе. Возвращает Counter с ключами
+    inserted, updated и unchanged.
+    """
+    stats = Counter(inserted=0, updated=0, unchanged=0)
+    started = time.monotonic()
+    pk = model._meta.pk
+    with open(path, 'r', encoding='utf-8', newline='') as csv_file:
+        reader = csv.DictReader(csv_file)
+        mapping = column_attnames(model, reader.fieldnames)
+        if pk not in mapping.values():
+            raise ValueError(
+                f'Для обновления {model.__name__} нужна колонка {pk.name}.'
+            )
+        compared = _comparable_fields(mapping)
+        attnames = [field.attname for field in compared.values()]
+        for batch in batches(reader, batch_size):
+            created, changed, rows = _diff_batch(
+                model, mapping, attnames, batch
+            )
+            stats['inserted'] += len(created)
+            stats['updated'] += len(changed)
+            stats['unchanged'] += rows - len(created) - len(changed)
+            if not dry_run:
+                with transaction.atomic(), _dates_from_file(mapping):
+                    model.objects.bulk_create(created, batch_size=batch_size)
+                    if changed and attnames:
+                        model.objects.bulk_update(
+                            changed, attnames, batch_size=batch_size
+                        )
+            if progress is not None:
+                progress(model, sum(stats.values()),
+                         time.monotonic() - started)
+    if not dry_run and (stats['inserted'] or stats['updated']):
+        models_bulk_changed.send(sender=model, models=[model])
+    return stats
+
+
+def _export_value(value):
+    # None остаётся None: csv.writer пишет пустую строку, а JSONL — null.
+    if hasattr(value, 'isoformat'):
+        return value.isoformat().replace('+00:00', 'Z')
+    return value
+
+
+def export_path(directory, model, export_format, compress=False):
+    name = DATA_NAMES[model].rsplit('.', 1)[0]
+    return os.path.join(
+        directory, f'{name}.{export_format}{".gz" if compress else ""}'
+    )
+
+
+def export_model(model, path, export_format='csv', compress=False,
+                 chunk_size=DEFAULT_BATCH_SIZE):
+    """Потоково выгружает модель в файл в раскладке static/data.
+
+    Строки читаются через iterator(chunk_size) (серверный курсор там, где
+    он поддерживается) и сразу пишутся в файл, поэтому память не зависит
+    от размера таблицы. Возвращает число выгруженных строк.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'Неизвестный формат выгрузки: {export_format}.')
+    columns = CSV_COLUMNS[model]
+    mapping = column_attnames(model, columns)
+    rows = model.objects.order_by('pk').values_list(
+        *(mapping[column].attname for column in columns)
+    ).iterator(chunk_size=chunk_size)
+    opener = gzip.open if compress else open
+    exported = 0
+    with opener(path, 'wt', encoding='utf-8', newline='') as output:
+        if export_format == 'csv':
+            writer = csv.writer(output)
+            writer.writerow(columns)
+        for row in rows:
+            values = [_export_value(value) for value in row]
+            if export_format == 'csv':
+                writer.writerow(values)
+            else:
+                output.write(json.dumps(
+                    dict(zip(columns, values)),
+                    cls=DjangoJSONEncoder,
+                    ensure_ascii=False,
+                ) + '\n')
+            exported += 1
+    return exported
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def _load_in_worker(label, path, batch_size):
+    started = time.monotonic()
+    rows = load_model(apps.get_model(label), path, batch_size=batch_size)
+    connections.close_all()
+    return label, rows, time.monotonic() - started
+
+
+def load_level_parallel(level, paths, workers,
+                        batch_size=DEFAULT_BATCH_SIZE):
+    """Загружает независимые друг от друга модели в пуле процессов.
+
+    Нужна СУБД с параллельными пишущими транзакциями: в SQLite воркеры
+    упрутся в блокировку базы. Возвращает кортежи (модель, строк, секунд)
+    по мере готовности.
+    """
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(level)),
+        initializer=_init_worker,
+        initargs=(settings.SETTINGS_MODULE,),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _load_in_worker, model._meta.label, paths[model], batch_size
+            )
+            for model in level
+        ]
+        for future in futures:
+            label, rows, seconds = future.result()
+            model = apps.get_model(label)
+            models_bulk_changed.send(sender=model, models=[model])
+            yield model, rows, seconds
+
+
+def _secondary_indexes(editor, model):
+    for field in model._meta.local_concrete_fields:
+        if not field.db_index or field.unique:
+            continue
+        names = editor._constraint_names(
+            model, [field.column], index=True, unique=False,
+            primary_key=False,
+        )
+        for name in names:
+            yield field, name
+
+
+@contextmanager
+def deferred_indexes(models, defer_constraints=True):
+    """Снимает вторичные индексы и ограничения моделей на время загрузки.
+
+    Индексы полей и Meta.indexes, а также Meta.constraints пересоздаются
+    после выхода из блока, в том числе при ошибке загрузки. В SQLite
+    ограничения входят в определение таблицы и не снимаются.
+    """
+    if connection.vendor == 'sqlite':
+        defer_constraints = False
+    restore = []
+    with connection.schema_editor() as editor:
+        for model in models:
+            for field, name in list(_secondary_indexes(editor, model)):
+                editor.execute(editor._delete_index_sql(model, name))
+                restore.append((model, 'field', field))
+            for index in model._meta.indexes:
+                editor.remove_index(model, index)
+                restore.append((model, 'index', index))
+            if not defer_constraints:
+                continue
+            for constraint in model._meta.constraints:
+                editor.remove_constraint(model, constraint)
+                restore.append((model, 'constraint', constraint))
+    try:
+        yield restore
+    finally:
+        with connection.schema_editor() as editor:
+            for model, kind, item in restore:
+                if kind == 'field':
+                    editor.execute(
+                        editor._create_index_sql(model, fields=[item])
+                    )
+                elif kind == 'index':
+                    editor.add_index(model, item)
+                else:
+                    editor.add_constraint(model, item)
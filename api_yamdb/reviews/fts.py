@@ -0,0 +1,24 @@
+"""Выражения ORM для индекса SQLite FTS5."""
+from django.db import models
+
+
+class FtsDocumentField(models.TextField):
+    """Скрытый столбец FTS5 с именем таблицы: левая часть MATCH и
+    аргумент вспомогательных функций вроде bm25."""
+
+
+@FtsDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class Bm25(models.Func):
+    """Релевантность bm25: чем меньше значение, тем выше строка."""
+
+    function = 'bm25'
+    output_field = models.FloatField()
@@ -0,0 +1,60 @@
+import statistics
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from reviews.search import (SEARCH_FIELDS, ContainsSearchBackend,
+                            get_search_backend, search_terms)
+
+DEFAULT_QUERIES = ('война', 'любовь', 'король')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время полнотекстового поиска с поиском подстрокой '
+        'на текущих данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'queries',
+            nargs='*',
+            default=DEFAULT_QUERIES,
+            help='Поисковые строки.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Сколько раз выполнять каждый запрос.',
+        )
+
+    def measure(self, backend, model, fields, terms, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            found = len(backend.search(model.objects.all(), fields, terms))
+            timings.append((time.perf_counter() - started) * 1000)
+        return found, statistics.median(timings), max(timings)
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('Число повторов должно быть положительным.')
+        backends = (
+            ('contains', ContainsSearchBackend()),
+            ('fts', get_search_backend()),
+        )
+        for model, fields in SEARCH_FIELDS.items():
+            for query in options['queries']:
+                terms = search_terms(query)
+                if not terms:
+                    continue
+                for name, backend in backends:
+                    found, median, slowest = self.measure(
+                        backend, model, fields, terms, options['repeat']
+                    )
+                    self.stdout.write(
+                        f'{model.__name__} «{query}» {name}: найдено '
+                        f'{found}, медиана {median:.2f} мс, максимум '
+                        f'{slowest:.2f} мс'
+                    )
@@ -0,0 +1,62 @@
+import os
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from reviews.csv_data import (DATA_NAMES, DEFAULT_BATCH_SIZE, EXPORT_FORMATS,
+                              export_model, export_path, load_order)
+
+
+class Command(BaseCommand):
+    help = 'Выгружает все модели reviews в csv или jsonl-файлы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='dump',
+            help='Каталог для файлов выгрузки.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=EXPORT_FORMATS,
+            default='csv',
+            help='Формат файлов: csv в раскладке static/data или jsonl.',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы gzip.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк, читаемых из базы за раз.',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        os.makedirs(options['output'], exist_ok=True)
+        started = time.monotonic()
+        total = 0
+        for model in load_order(DATA_NAMES):
+            model_started = time.monotonic()
+            path = export_path(
+                options['output'], model, options['format'], options['gzip']
+            )
+            rows = export_model(
+                model,
+                path,
+                export_format=options['format'],
+                compress=options['gzip'],
+                chunk_size=options['chunk_size'],
+            )
+            total += rows
+            self.stdout.write(
+                f'{model.__name__}: выгружено {rows} строк в {path} за '
+                f'{time.monotonic() - model_started:.2f} с'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено {total} строк за {time.monotonic() - started:.2f} с.'
+        ))
@@ -1,31 +1,176 @@
-import csv
-import logging
+import time
+from contextlib import nullcontext
 
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DatabaseError, connection
 
-from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
-                            Title, User)
+from reviews.csv_data import (DATA_NAMES, DEFAULT_BATCH_SIZE,
+                              deferred_indexes, dependency_levels,
+                              load_level_parallel, load_model, upsert_model)
+from reviews.models import Review
+from reviews.ratings import rebuild_ratings
+from reviews.search import rebuild_search_index
 
-DATA_NAMES = {
-    Category: 'category.csv',
-    Comment: 'comments.csv',
-    Genre: 'genre.csv',
-    GenreTitle: 'genre_title.csv',
-    Review: 'review.csv',
-    Title: 'titles.csv',
-    User: 'users.csv'
-}
+
+PROGRESS_INTERVAL = 1
 
 
 class Command(BaseCommand):
-    def handle(self, *args, **kwargs):
-        logger = logging.getLogger(__name__)
-        for model, csv_filename in DATA_NAMES.items():
-            with open(f'{settings.BASE_DIR}/static/data/{csv_filename}',
-                      'r',
-                      encoding='utf-8') as csv_file:
-                reader = csv.DictReader(csv_file)
-                model.objects.bulk_create(
-                    model(**data) for data in reader)
-                logger.info('Данные из csv-файла были успешно загружены')
+    help = 'Загружает данные из csv-файлов в порядке внешних ключей.'
+    last_report = 0
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной транзакции.',
+        )
+        parser.add_argument(
+            '--data-dir',
+            default=settings.BASE_DIR / 'static' / 'data',
+            help='Каталог с csv-файлами.',
+        )
+        parser.add_argument(
+            '--parallel',
+            type=int,
+            default=1,
+            help='Число процессов для одновременной загрузки независимых '
+                 'таблиц.',
+        )
+        parser.add_argument(
+            '--defer-indexes',
+            action='store_true',
+            help='Снять вторичные индексы и ограничения на время загрузки '
+                 'и пересоздать их после неё.',
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help='Добавить новые и обновить изменённые строки, не трогая '
+                 'совпадающие. Можно запускать повторно.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Вместе с --upsert: только посчитать изменения.',
+        )
+
+    def report_progress(self, model, rows, seconds):
+        if time.monotonic() - self.last_report < PROGRESS_INTERVAL:
+            return
+        self.last_report = time.monotonic()
+        self.stdout.write(
+            f'{model.__name__}: {rows} строк, '
+            f'{rows / seconds if seconds else 0:.0f} строк/с',
+            ending='\r' if self.stdout.isatty() else '\n',
+        )
+
+    def report_loaded(self, model, rows, seconds):
+        self.stdout.write(
+            f'{model.__name__}: загружено {rows} строк за {seconds:.2f} с '
+            f'({rows / seconds if seconds else 0:.0f} строк/с)'
+        )
+
+    def upsert_level(self, level, paths, options):
+        for model in level:
+            started = time.monotonic()
+            stats = upsert_model(
+                model,
+                paths[model],
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+                progress=self.report_progress,
+            )
+            self.stdout.write(
+                f'{model.__name__}: добавлено {stats["inserted"]}, '
+                f'обновлено {stats["updated"]}, без изменений '
+                f'{stats["unchanged"]}'
+            )
+            changed = stats['inserted'] + stats['updated']
+            yield model, changed, time.monotonic() - started
+
+    def load_level(self, level, paths, options):
+        if options['upsert']:
+            yield from self.upsert_level(level, paths, options)
+            return
+        if options['parallel'] > 1 and len(level) > 1:
+            yield from load_level_parallel(
+                level, paths, options['parallel'], options['batch_size']
+            )
+            return
+        for model in level:
+            started = time.monotonic()
+            rows = load_model(
+                model,
+                paths[model],
+                batch_size=options['batch_size'],
+                progress=self.report_progress,
+            )
+            yield model, rows, time.monotonic() - started
+
+    def check_options(self, options):
+        if options['batch_size'] < 1 or options['parallel'] < 1:
+            raise CommandError(
+                'Размер пачки и число процессов должны быть положительными.'
+            )
+        if options['upsert'] and options['parallel'] > 1:
+            raise CommandError('--upsert выполняется в одном процессе.')
+        if options['parallel'] > 1 and connection.vendor == 'sqlite':
+            raise CommandError(
+                'SQLite допускает только одну пишущую транзакцию: '
+                '--parallel недоступен.'
+            )
+        if options['dry_run'] and not options['upsert']:
+            raise CommandError('--dry-run работает только с --upsert.')
+
+    def handle(self, *args, **options):
+        self.check_options(options)
+        levels = dependency_levels(DATA_NAMES)
+        models = [model for level in levels for model in level]
+        paths = {
+            model: f'{options["data_dir"]}/{filename}'
+            for model, filename in DATA_NAMES.items()
+        }
+        started = time.monotonic()
+        total = 0
+        indexes = (
+            deferred_indexes(models) if options['defer_indexes']
+            else nullcontext()
+        )
+        try:
+            with indexes:
+                for level in levels:
+                    for model, rows, seconds in self.load_level(
+                        level, paths, options
+                    ):
+                        total += rows
+                        if not options['upsert']:
+                            self.report_loaded(model, rows, seconds)
+        except (OSError, ValueError, DatabaseError) as error:
+            raise CommandError(f'Ошибка загрузки: {error}')
+        if options['defer_indexes']:
+            self.stdout.write('Индексы и ограничения пересозданы.')
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                'Пробный запуск: данные не изменены.'
+            ))
+            return
+        self.reset_sequences(models)
+        if Review in models:
+            rebuild_ratings()
+        rebuild_search_index(models)
+        seconds = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные из csv-файлов загружены: {total} строк за '
+            f'{seconds:.2f} с ({total / seconds if seconds else 0:.0f} '
+            'строк/с)'
+        ))
+
+    def reset_sequences(self, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
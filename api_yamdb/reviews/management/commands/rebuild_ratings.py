@@ -0,0 +1,34 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.ratings import find_rating_drift, rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинги произведений по сохранённым отзывам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить расхождения, не изменяя данные.',
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(find_rating_drift())
+        for title in drifted:
+            self.stdout.write(
+                f'{title.pk}: отзывов {title.reviews_count} '
+                f'(ожидалось {title.expected_count}), сумма оценок '
+                f'{title.score_sum} (ожидалось {title.expected_sum})'
+            )
+        if options['check']:
+            if drifted:
+                raise CommandError(
+                    f'Рейтинги расходятся у {len(drifted)} произведений.'
+                )
+            self.stdout.write('Расхождений в рейтингах нет.')
+            return
+        with transaction.atomic():
+            updated = rebuild_ratings()
+        self.stdout.write(f'Пересчитаны рейтинги {updated} произведений.')
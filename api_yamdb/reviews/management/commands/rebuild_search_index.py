@@ -0,0 +1,19 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from reviews.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает полнотекстовый индекс произведений, отзывов и '
+        'комментариев.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            indexed = rebuild_search_index()
+        for model, rows in indexed.items():
+            self.stdout.write(
+                f'{model.__name__}: проиндексировано {rows} строк'
+            )
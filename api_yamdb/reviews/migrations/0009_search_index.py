@@ -0,0 +1,63 @@
+from django.db import migrations
+
+FTS_TOKENIZE = "tokenize='unicode61 remove_diacritics 2'"
+
+
+class SqliteRunSQL(migrations.RunSQL):
+    """RunSQL, который выполняется только на SQLite.
+
+    На остальных СУБД поиск работает без отдельного индекса.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.vendor == 'sqlite':
+            super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if schema_editor.connection.vendor == 'sqlite':
+            super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_rating_aggregates'),
+    ]
+
+    operations = [
+        SqliteRunSQL(
+            sql=[
+                'CREATE VIRTUAL TABLE IF NOT EXISTS "reviews_title_fts" '
+                f'USING fts5("name", "description", {FTS_TOKENIZE})',
+                'INSERT INTO "reviews_title_fts" '
+                '(rowid, "name", "description") '
+                'SELECT "id", COALESCE("name", \'\'), '
+                'COALESCE("description", \'\') FROM "reviews_title"',
+            ],
+            reverse_sql='DROP TABLE IF EXISTS "reviews_title_fts"',
+        ),
+        SqliteRunSQL(
+            sql=[
+                'CREATE VIRTUAL TABLE IF NOT EXISTS "reviews_review_fts" '
+                f'USING fts5("text", {FTS_TOKENIZE})',
+                'INSERT INTO "reviews_review_fts" (rowid, "text") '
+                'SELECT "id", COALESCE("text", \'\') FROM "reviews_review"',
+            ],
+            reverse_sql='DROP TABLE IF EXISTS "reviews_review_fts"',
+        ),
+        SqliteRunSQL(
+            sql=[
+                'CREATE VIRTUAL TABLE IF NOT EXISTS "reviews_comment_fts" '
+                f'USING fts5("text", {FTS_TOKENIZE})',
+                'INSERT INTO "reviews_comment_fts" (rowid, "text") '
+                'SELECT "id", COALESCE("text", \'\') FROM "reviews_comment"',
+            ],
+            reverse_sql='DROP TABLE IF EXISTS "reviews_comment_fts"',
+        ),
+    ]
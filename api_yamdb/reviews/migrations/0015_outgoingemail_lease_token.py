@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_model_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='lease_token',
+            field=models.CharField(blank=True, db_index=True, max_length=32, verbose_name='Аренда'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2 on 2026-10-18 03:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.fts
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0015_outgoingemail_lease_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentSearchEntry',
+            fields=[
+                ('comment', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='reviews.comment')),
+                ('document', reviews.fts.FtsDocumentField(db_column='reviews_comment_fts')),
+            ],
+            options={
+                'db_table': 'reviews_comment_fts',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ReviewSearchEntry',
+            fields=[
+                ('review', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='reviews.review')),
+                ('document', reviews.fts.FtsDocumentField(db_column='reviews_review_fts')),
+            ],
+            options={
+                'db_table': 'reviews_review_fts',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TitleSearchEntry',
+            fields=[
+                ('title', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='reviews.title')),
+                ('document', reviews.fts.FtsDocumentField(db_column='reviews_title_fts')),
+            ],
+            options={
+                'db_table': 'reviews_title_fts',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+    ]
@@ -2,9 +2,11 @@ from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 from .abstract import BaseModel
 from .constants import MAX_LENGTH_EMAIL, MAX_LENGTH_MODEL
+from .fts import FtsDocumentField
 from .validators import year_validator
 
 ROLE_CHOICES = (
@@ -55,11 +57,27 @@ class Title(models.Model):
         null=True,
         verbose_name='Описание'
     )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Рейтинг'
+    )
+    reviews_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество отзывов'
+    )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок'
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('name',)
+        indexes = [
+            models.Index(fields=['year'], name='title_year_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -71,6 +89,12 @@ class GenreTitle(models.Model):
     genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
     piece = models.ForeignKey(Title, on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['piece', 'genre'], name='unique_genre_title')
+        ]
+
     def __str__(self):
         return f'{self.genre} - {self.piece}'
 
@@ -119,6 +143,7 @@ class Review(models.Model):
     score = models.PositiveSmallIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(10)], default=0)
     pub_date = models.DateTimeField(auto_now_add=True)
+    is_hidden = models.BooleanField(default=False, verbose_name='Скрыт')
 
     class Meta:
         ordering = ('-pub_date',)
@@ -126,6 +151,12 @@ class Review(models.Model):
             models.UniqueConstraint(
                 fields=['author', 'title'], name="unique_review")
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_date_idx'
+            ),
+        ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
 
@@ -142,12 +173,165 @@ class Comment(models.Model):
     author = models.ForeignKey(
         User, on_delete=models.CASCADE)
     pub_date = models.DateTimeField(auto_now_add=True, db_index=True)
+    is_hidden = models.BooleanField(default=False, verbose_name='Скрыт')
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date'], name='comment_review_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.review
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    PENDING = 'pending'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает отправки'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    subject = models.CharField(
+        max_length=MAX_LENGTH_MODEL, verbose_name='Тема'
+    )
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.EmailField(
+        max_length=MAX_LENGTH_EMAIL, verbose_name='Отправитель'
+    )
+    recipient = models.EmailField(
+        max_length=MAX_LENGTH_EMAIL, verbose_name='Получатель'
+    )
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток отправки'
+    )
+    send_after = models.DateTimeField(
+        default=timezone.now, verbose_name='Отправить не раньше'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    lease_token = models.CharField(
+        max_length=32, blank=True, db_index=True, verbose_name='Аренда'
+    )
+    created = models.DateTimeField(auto_now_add=True, verbose_name='Создано')
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('send_after', 'id')
+        indexes = [
+            models.Index(
+                fields=['status', 'send_after'], name='outgoing_email_due_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
+
+
+class ConfirmationCode(models.Model):
+    """Код подтверждения для получения токена.
+
+    Хранится только соль и SHA-256 кода: код одноразовый, живёт
+    недолго и ограничен по числу попыток, поэтому медленный хеш
+    паролей ему не нужен.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='confirmation_code',
+        verbose_name='Пользователь'
+    )
+    salt = models.CharField(max_length=32, verbose_name='Соль')
+    code_hash = models.CharField(max_length=64, verbose_name='Хеш кода')
+    expires_at = models.DateTimeField(verbose_name='Действует до')
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Неудачных попыток'
+    )
+
+    class Meta:
+        verbose_name = 'Код подтверждения'
+        verbose_name_plural = 'Коды подтверждения'
+
+    def __str__(self):
+        return f'{self.user}: до {self.expires_at}'
+
+
+class ModelVersion(models.Model):
+    """Версия данных модели, общая для всех процессов приложения.
+
+    Из версий строятся ключи кеша ответов и валидаторы условных
+    запросов, поэтому запись в одном процессе видна остальным. Кроме
+    моделей, версию имеют claims пользователей в выданных токенах.
+    """
+
+    label = models.CharField(
+        max_length=100, primary_key=True, verbose_name='Модель'
+    )
+    version = models.BigIntegerField(verbose_name='Версия')
+    modified = models.DateTimeField(verbose_name='Изменена')
+
+    class Meta:
+        verbose_name = 'Версия модели'
+        verbose_name_plural = 'Версии моделей'
+
+    def __str__(self):
+        return f'{self.label}: {self.version}'
+
+
+class SearchEntry(models.Model):
+    """Строка индекса SQLite FTS5 для присоединения к запросу.
+
+    Виртуальные таблицы создаёт миграция поискового индекса. rowid строки
+    совпадает с первичным ключом объекта, а document — скрытый столбец
+    FTS5 с именем таблицы.
+    """
+
+    class Meta:
+        abstract = True
+        managed = False
+
+
+class TitleSearchEntry(SearchEntry):
+    title = models.OneToOneField(
+        Title, on_delete=models.DO_NOTHING, primary_key=True,
+        db_column='rowid', db_constraint=False, related_name='search_entry'
+    )
+    document = FtsDocumentField(db_column='reviews_title_fts')
+
+    class Meta(SearchEntry.Meta):
+        db_table = 'reviews_title_fts'
+
+
+class ReviewSearchEntry(SearchEntry):
+    review = models.OneToOneField(
+        Review, on_delete=models.DO_NOTHING, primary_key=True,
+        db_column='rowid', db_constraint=False, related_name='search_entry'
+    )
+    document = FtsDocumentField(db_column='reviews_review_fts')
+
+    class Meta(SearchEntry.Meta):
+        db_table = 'reviews_review_fts'
+
+
+class CommentSearchEntry(SearchEntry):
+    comment = models.OneToOneField(
+        Comment, on_delete=models.DO_NOTHING, primary_key=True,
+        db_column='rowid', db_constraint=False, related_name='search_entry'
+    )
+    document = FtsDocumentField(db_column='reviews_comment_fts')
+
+    class Meta(SearchEntry.Meta):
+        db_table = 'reviews_comment_fts'
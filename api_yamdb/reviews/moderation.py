@@ -0,0 +1,69 @@
+"""Массовая модерация отзывов и комментариев.
+
+Выбранные объекты удаляются или скрываются одним DELETE/UPDATE по
+queryset, без загрузки строк и сигналов post_delete для каждого объекта.
+Рейтинги затронутых произведений пересчитываются одним UPDATE, а кеши
+сбрасываются сигналом models_bulk_changed.
+"""
+from django.db import transaction
+
+from .models import Comment, Review, Title
+from .ratings import rebuild_ratings
+from .search import get_search_backend
+from .signals import models_bulk_changed
+
+
+def _raw_delete(queryset):
+    # Тот же путь, которым сборщик удаления Django удаляет строки без
+    # приёмников сигналов: один DELETE без загрузки объектов.
+    get_search_backend().remove_queryset(queryset)
+    return queryset._raw_delete(queryset.db)
+
+
+def _rated_titles(reviews):
+    title_ids = reviews.order_by().values_list('title_id', flat=True)
+    return list(title_ids.distinct())
+
+
+def delete_comments(queryset):
+    """Удаляет комментарии queryset и возвращает их число."""
+    with transaction.atomic():
+        deleted = _raw_delete(queryset)
+    models_bulk_changed.send(sender=Comment, models=[Comment])
+    return deleted
+
+
+def delete_reviews(queryset):
+    """Удаляет отзывы queryset вместе с комментариями к ним.
+
+    Возвращает число удалённых отзывов.
+    """
+    with transaction.atomic():
+        title_ids = _rated_titles(queryset)
+        _raw_delete(Comment.objects.filter(review__in=queryset))
+        deleted = _raw_delete(queryset)
+        if deleted:
+            rebuild_ratings(Title.objects.filter(pk__in=title_ids))
+    models_bulk_changed.send(sender=Review, models=[Review, Comment])
+    return deleted
+
+
+def hide_comments(queryset, hidden=True):
+    """Скрывает комментарии queryset или снова показывает их."""
+    updated = queryset.update(is_hidden=hidden)
+    models_bulk_changed.send(sender=Comment, models=[Comment])
+    return updated
+
+
+def hide_reviews(queryset, hidden=True):
+    """Скрывает отзывы queryset или снова показывает их.
+
+    Скрытые отзывы не учитываются в рейтинге произведения.
+    """
+    with transaction.atomic():
+        title_ids = _rated_titles(queryset)
+        updated = queryset.update(is_hidden=hidden)
+        if updated:
+            rebuild_ratings(Title.objects.filter(pk__in=title_ids))
+    models_bulk_changed.send(sender=Review, models=[Review])
+    return updated
@@ -0,0 +1,68 @@
+from django.db.models import (Avg, Case, Count, F, FloatField, OuterRef,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
+
+from .models import Review, Title
+from .signals import models_bulk_changed
+
+
+def apply_review_delta(title_id, score_delta, count_delta=0):
+    """Атомарно сдвигает агрегаты произведения одним UPDATE.
+
+    Все выражения вычисляются по значениям строки до обновления,
+    поэтому рейтинг считается от уже сдвинутых суммы и количества.
+    """
+    new_sum = F('score_sum') + score_delta
+    new_count = F('reviews_count') + count_delta
+    return Title.objects.filter(pk=title_id).update(
+        rating=Case(
+            When(reviews_count=-count_delta, then=Value(None)),
+            default=Cast(new_sum, FloatField()) / new_count,
+            output_field=FloatField(),
+        ),
+        score_sum=new_sum,
+        reviews_count=new_count,
+    )
+
+
+def _review_aggregate(aggregate):
+    # Скрытые модератором отзывы в рейтинге не учитываются.
+    reviews = Review.objects.filter(
+        title=OuterRef('pk'), is_hidden=False
+    ).order_by()
+    return Subquery(
+        reviews.values('title').annotate(value=aggregate).values('value')
+    )
+
+
+def expected_aggregates(queryset):
+    """Аннотирует произведения агрегатами, посчитанными по отзывам."""
+    return queryset.annotate(
+        expected_count=Coalesce(_review_aggregate(Count('pk')), 0),
+        expected_sum=Coalesce(_review_aggregate(Sum('score')), 0),
+        expected_rating=_review_aggregate(Avg('score')),
+    )
+
+
+def find_rating_drift(queryset=None):
+    """Возвращает произведения, чьи сохранённые агрегаты устарели."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    drifted = expected_aggregates(queryset).exclude(
+        reviews_count=F('expected_count'),
+        score_sum=F('expected_sum'),
+    )
+    return drifted.order_by('pk')
+
+
+def rebuild_ratings(queryset=None):
+    """Пересчитывает агрегаты произведений с нуля одним UPDATE."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    updated = queryset.order_by().update(
+        reviews_count=Coalesce(_review_aggregate(Count('pk')), 0),
+        score_sum=Coalesce(_review_aggregate(Sum('score')), 0),
+        rating=_review_aggregate(Avg('score')),
+    )
+    models_bulk_changed.send(sender=Title, models=[Title])
+    return updated
@@ -0,0 +1,239 @@
+import re
+
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save
+
+from .fts import Bm25
+from .models import Comment, Review, Title
+from .signals import models_bulk_changed
+
+SEARCH_FIELDS = {
+    Title: ('name', 'description'),
+    Review: ('text',),
+    Comment: ('text',),
+}
+SEARCH_CONFIG = 'russian'
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def search_terms(query):
+    """Разбивает поисковую строку на слова без служебных символов."""
+    return WORD_PATTERN.findall(query.lower())
+
+
+class ContainsSearchBackend:
+    """Поиск подстрокой без индекса: запасной вариант для любой СУБД.
+
+    Каждое слово должно встретиться хотя бы в одном из полей. Ранжирования
+    нет, порядок выдачи не меняется.
+    """
+
+    def __init__(self, using=connection):
+        self.connection = using
+
+    def create_index(self, model, fields):
+        pass
+
+    def drop_index(self, model):
+        pass
+
+    def rebuild(self, model, fields):
+        return 0
+
+    def update(self, instance, fields):
+        pass
+
+    def remove(self, model, pk):
+        pass
+
+    def remove_queryset(self, queryset):
+        pass
+
+    def update_queryset(self, queryset, fields):
+        pass
+
+    def search(self, queryset, fields, terms):
+        for term in terms:
+            condition = Q()
+            for field in fields:
+                condition |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+class SqliteFtsSearchBackend(ContainsSearchBackend):
+    """Полнотекстовый поиск на виртуальных таблицах SQLite FTS5.
+
+    Для каждой модели заводится таблица <db_table>_fts, rowid которой
+    совпадает с первичным ключом. Слова ищутся по префиксу, результаты
+    упорядочиваются по bm25.
+    """
+
+    def table(self, model):
+        return self.connection.ops.quote_name(f'{model._meta.db_table}_fts')
+
+    def create_index(self, model, fields):
+        columns = ', '.join(
+            self.connection.ops.quote_name(field) for field in fields
+        )
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table(model)} '
+                f"USING fts5({columns}, tokenize='unicode61 "
+                f"remove_diacritics 2')"
+            )
+
+    def drop_index(self, model):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {self.table(model)}')
+
+    def insert_from_table(self, cursor, model, fields, where='', params=()):
+        quote = self.connection.ops.quote_name
+        columns = ', '.join(quote(field) for field in fields)
+        values = ', '.join(
+            f"COALESCE({quote(model._meta.get_field(field).column)}, '')"
+            for field in fields
+        )
+        cursor.execute(
+            f'INSERT INTO {self.table(model)} (rowid, {columns}) '
+            f'SELECT {quote(model._meta.pk.column)}, {values} '
+            f'FROM {quote(model._meta.db_table)}{where}',
+            params,
+        )
+        return cursor.rowcount
+
+    def rebuild(self, model, fields):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table(model)}')
+            return self.insert_from_table(cursor, model, fields)
+
+    def update(self, instance, fields):
+        table = self.table(type(instance))
+        columns = ', '.join(
+            self.connection.ops.quote_name(field) for field in fields
+        )
+        placeholders = ', '.join(['%s'] * len(fields))
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE rowid = %s', [instance.pk]
+            )
+            cursor.execute(
+                f'INSERT INTO {table} (rowid, {columns}) '
+                f'VALUES (%s, {placeholders})',
+                [instance.pk] + [
+                    getattr(instance, field) or '' for field in fields
+                ],
+            )
+
+    def remove(self, model, pk):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table(model)} WHERE rowid = %s', [pk]
+            )
+
+    def remove_queryset(self, queryset):
+        # Строки индекса удаляются одним запросом по подзапросу
+        # первичных ключей, без загрузки объектов.
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table(queryset.model)} '
+                f'WHERE rowid IN ({sql})',
+                params,
+            )
+
+    def update_queryset(self, queryset, fields):
+        self.remove_queryset(queryset)
+        model = queryset.model
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        pk_column = self.connection.ops.quote_name(model._meta.pk.column)
+        with self.connection.cursor() as cursor:
+            self.insert_from_table(
+                cursor, model, fields, f' WHERE {pk_column} IN ({sql})',
+                params,
+            )
+
+    def search(self, queryset, fields, terms):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # Таблица FTS присоединяется к запросу через SearchEntry, а не
+        # опрашивается подзапросом для каждой строки: в подзапросе bm25
+        # заново собирает статистику слов на каждой строке.
+        return queryset.filter(search_entry__document__match=match).annotate(
+            search_rank=Bm25('search_entry__document')
+        ).order_by('search_rank', 'pk')
+
+
+class PostgresSearchBackend(ContainsSearchBackend):
+    """Полнотекстовый поиск PostgreSQL по tsvector с ранжированием.
+
+    Вектор строится выражением при запросе, отдельная таблица не нужна.
+    """
+
+    def search(self, queryset, fields, terms):
+        from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                                    SearchVector)
+
+        query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            config=SEARCH_CONFIG,
+            search_type='raw',
+        )
+        return queryset.annotate(
+            search_vector=SearchVector(*fields, config=SEARCH_CONFIG),
+        ).filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query),
+        ).order_by('-search_rank', 'pk')
+
+
+SEARCH_BACKENDS = {
+    'sqlite': SqliteFtsSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend(using=connection):
+    return SEARCH_BACKENDS.get(using.vendor, ContainsSearchBackend)(using)
+
+
+def search(queryset, query):
+    """Оставляет в queryset объекты, подходящие под поисковую строку,
+    и упорядочивает их по релевантности."""
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+    return get_search_backend().search(
+        queryset, SEARCH_FIELDS[queryset.model], terms
+    )
+
+
+def index_instance(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_search_backend().update(instance, SEARCH_FIELDS[sender])
+
+
+def unindex_instance(sender, instance, **kwargs):
+    get_search_backend().remove(sender, instance.pk)
+
+
+for model in SEARCH_FIELDS:
+    post_save.connect(index_instance, sender=model)
+    post_delete.connect(unindex_instance, sender=model)
+
+
+def rebuild_search_index(models=None):
+    """Перестраивает поисковый индекс моделей целиком.
+
+    Возвращает словарь «модель — число проиндексированных строк».
+    """
+    backend = get_search_backend()
+    indexed = {}
+    for model, fields in SEARCH_FIELDS.items():
+        if models is not None and model not in models:
+            continue
+        backend.create_index(model, fields)
+        indexed[model] = backend.rebuild(model, fields)
+    models_bulk_changed.send(
+        sender=rebuild_search_index, models=list(indexed)
+    )
+    return indexed
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Отправляется после массовых операций (bulk_create, update), которые не
+# вызывают post_save/post_delete. Аргумент models — изменённые модели.
+models_bulk_changed = Signal()
@@ -0,0 +1,55 @@
+"""Пакетное создание произведений с жанрами."""
+from django.db import IntegrityError, transaction
+
+from .models import GenreTitle, Title
+from .search import SEARCH_FIELDS, get_search_backend
+from .signals import models_bulk_changed
+
+
+def _recover_pks(titles):
+    """Находит ключи только что вставленных произведений.
+
+    СУБД без RETURNING (SQLite, MySQL) не сообщают ключи строк из
+    bulk_create. Многострочный INSERT выполняется одним оператором, и до
+    конца транзакции она держит блокировку записи, поэтому вставленные
+    строки — последние по ключу. Поля строк сверяются с пакетом: если
+    ключи не удалось сопоставить, поднимается IntegrityError.
+    """
+    rows = list(Title.objects.order_by('-pk').values_list(
+        'pk', 'name', 'year', 'category_id'
+    )[:len(titles)])
+    rows.reverse()
+    if [row[1:] for row in rows] != [
+        (title.name, title.year, title.category_id) for title in titles
+    ]:
+        raise IntegrityError(
+            'Не удалось определить ключи вставленных произведений.'
+        )
+    for title, row in zip(titles, rows):
+        title.pk = row[0]
+
+
+def bulk_create_titles(titles, genres):
+    """Создаёт произведения и их связи с жанрами в одной транзакции.
+
+    genres — списки жанров в порядке titles. Произведения и связи
+    вставляются через bulk_create, поисковый индекс пополняется одним
+    запросом. Ключи назначает СУБД; если она их не возвращает, они
+    перечитываются внутри транзакции. IntegrityError откатывает весь
+    пакет.
+    """
+    with transaction.atomic():
+        Title.objects.bulk_create(titles)
+        if titles[0].pk is None:
+            _recover_pks(titles)
+        GenreTitle.objects.bulk_create(
+            GenreTitle(piece=title, genre=genre)
+            for title, title_genres in zip(titles, genres)
+            for genre in title_genres
+        )
+        get_search_backend().update_queryset(
+            Title.objects.filter(pk__in=[title.pk for title in titles]),
+            SEARCH_FIELDS[Title],
+        )
+    models_bulk_changed.send(sender=Title, models=[Title, GenreTitle])
+    return titles
@@ -0,0 +1,175 @@
+"""Нагрузочные бюджеты эндпоинтов: наполнение базы и замеры запросов.
+
+Объём данных задаётся переменной окружения YAMDB_BUDGET_SCALE: по
+умолчанию (10) создаётся 200 произведений и 20 000 отзывов, при 500 —
+10 000 произведений и миллион отзывов. YAMDB_BUDGET_REPEAT — сколько раз
+повторять каждый безопасный запрос для оценки p95.
+
+Время ответа зависит от машины, поэтому по умолчанию проверяется только
+число запросов к базе. YAMDB_BUDGET_LATENCY_FACTOR включает проверку p95
+и умножает допустимое время ответа: 1 — бюджеты как есть, 3 — втрое
+мягче.
+"""
+import os
+import statistics
+import time
+from collections import namedtuple
+from itertools import count
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+SCALE = int(os.getenv('YAMDB_BUDGET_SCALE', '10'))
+REPEAT = int(os.getenv('YAMDB_BUDGET_REPEAT', '5'))
+LATENCY_FACTOR = float(os.getenv('YAMDB_BUDGET_LATENCY_FACTOR', '0'))
+SEED_BATCH_SIZE = 5000
+TITLES_PER_SCALE = 20
+MAX_AUTHORS = 100
+COMMENTS_PER_REVIEW = 3
+SAFE_METHODS = ('get', 'head', 'options')
+
+Budget = namedtuple(
+    'Budget', 'route method url max_queries p95_ms status data format',
+    defaults=(200, None, None),
+)
+Measurement = namedtuple(
+    'Measurement', 'budget url status queries max_queries p95_ms'
+)
+
+
+def seed_catalogue(scale=SCALE):
+    """Наполняет базу каталогом с отзывами и возвращает подстановки
+    для шаблонов URL бюджетов."""
+    from benchmark.generator import insert, next_pk
+    from reviews.models import (Category, Comment, Genre, GenreTitle,
+                                Review, Title, User)
+    from reviews.ratings import rebuild_ratings
+    from reviews.search import rebuild_search_index
+
+    titles = TITLES_PER_SCALE * scale
+    authors = min(TITLES_PER_SCALE * scale, MAX_AUTHORS)
+    with transaction.atomic():
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [
+            Genre.objects.create(name=name, slug=slug)
+            for name, slug in (
+                ('Драма', 'drama'), ('Комедия', 'comedy'), ('Ужасы', 'horror')
+            )
+        ]
+        first_user = next_pk(User)
+        insert(User, (
+            User(
+                pk=first_user + idx, username=f'budget{idx}',
+                email=f'budget{idx}@yamdb.fake'
+            )
+            for idx in range(authors)
+        ), SEED_BATCH_SIZE)
+        first_title = next_pk(Title)
+        insert(Title, (
+            Title(
+                pk=first_title + idx, name=f'Произведение {idx}',
+                year=1950 + idx % 70, category=category,
+                description=f'Описание произведения {idx}'
+            )
+            for idx in range(titles)
+        ), SEED_BATCH_SIZE)
+        insert(GenreTitle, (
+            GenreTitle(piece_id=first_title + idx, genre=genre)
+            for idx in range(titles)
+            for genre in genres[:1 + idx % len(genres)]
+        ), SEED_BATCH_SIZE)
+        review_ids = count(next_pk(Review))
+        first_review = next_pk(Review)
+        insert(Review, (
+            Review(
+                pk=next(review_ids), title_id=first_title + idx,
+                author_id=first_user + author, score=1 + (idx + author) % 10,
+                text=f'Отзыв {author} о произведении {idx}'
+            )
+            for idx in range(titles)
+            for author in range(authors)
+        ), SEED_BATCH_SIZE)
+        insert(Comment, (
+            Comment(
+                review_id=first_review + review, author_id=first_user + idx,
+                text=f'Комментарий {idx}'
+            )
+            for review in range(authors)
+            for idx in range(COMMENTS_PER_REVIEW)
+        ), SEED_BATCH_SIZE)
+        rebuild_ratings()
+        rebuild_search_index()
+    return {
+        'title': first_title,
+        'review': first_review,
+        'comment': Comment.objects.filter(
+            review_id=first_review
+        ).values_list('pk', flat=True).first(),
+        'genre': genres[-1].slug,
+        'category': category.slug,
+        'username': f'budget{authors - 1}',
+        'titles': titles,
+    }
+
+
+def p95(timings):
+    if len(timings) < 2:
+        return timings[0]
+    return statistics.quantiles(timings, n=20, method='inclusive')[-1]
+
+
+def measure(client, budget, values, repeat=REPEAT):
+    """Выполняет запрос бюджета с холодным кешем и возвращает замер.
+
+    Безопасные запросы повторяются repeat раз, изменяющие — один.
+    Число запросов к базе — максимум по повторам. Бюджет запросов может
+    быть функцией от подстановок, если он растёт с объёмом данных, а
+    тело запроса — если ссылается на созданные при наполнении объекты.
+    """
+    url = budget.url.format(**values)
+    max_queries = budget.max_queries
+    if callable(max_queries):
+        max_queries = max_queries(values)
+    data = budget.data
+    if callable(data):
+        data = data(values)
+    extra = {'format': budget.format} if budget.format else {}
+    if budget.method not in SAFE_METHODS:
+        repeat = 1
+    timings, queries, status = [], 0, None
+    for _ in range(repeat):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = getattr(client, budget.method)(url, data, **extra)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, len(context))
+        status = response.status_code
+    return Measurement(
+        budget, url, status, queries, max_queries, p95(timings)
+    )
+
+
+def violations(measurement):
+    budget = measurement.budget
+    found = []
+    if measurement.status != budget.status:
+        found.append(
+            f'статус {measurement.status} вместо {budget.status}'
+        )
+    if measurement.queries > measurement.max_queries:
+        found.append(
+            f'{measurement.queries} запросов к базе при бюджете '
+            f'{measurement.max_queries}'
+        )
+    if LATENCY_FACTOR and (
+        measurement.p95_ms > budget.p95_ms * LATENCY_FACTOR
+    ):
+        found.append(
+            f'p95 {measurement.p95_ms:.1f} мс при бюджете '
+            f'{budget.p95_ms * LATENCY_FACTOR:.0f} мс'
+        )
+    return found
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def response_cache(settings):
+    # Кеш ответов проверяется отдельно в test_10: в остальных тестах он
+    # отключён, чтобы не подменять собой проверяемые запросы к базе.
+    settings.RESPONSE_CACHE_TIMEOUT = 0
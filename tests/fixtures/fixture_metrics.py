@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    # Файлы метрик каждого теста — в его временном каталоге, а не в
+    # общем METRICS_DIR.
+    settings.METRICS_DIR = tmp_path
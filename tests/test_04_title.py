@@ -353,3 +353,78 @@ class Test04TitleAPI:
             f'Проверьте, что PUT-запрос к `{self.TITLES_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    @pytest.mark.parametrize('titles_count', (3, 10, 25))
+    def test_07_titles_list_query_count(self, client, titles_count,
+                                        django_assert_num_queries):
+        from reviews.models import Category, Genre, GenreTitle, Title
+
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(3)
+        ]
+        for idx in range(titles_count):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            GenreTitle.objects.bulk_create(
+                GenreTitle(genre=genre, piece=title) for genre in genres
+            )
+
+        with django_assert_num_queries(4):
+            response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert results and all(
+            len(title['genre']) == len(genres) for title in results
+        ), (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` возвращает '
+            'жанры и категорию каждого произведения.'
+        )
+
+    def test_08_titles_export(self, client, settings,
+                              django_assert_max_num_queries):
+        import json
+
+        from reviews.models import Category, Genre, GenreTitle, Title
+
+        settings.EXPORT_CHUNK_SIZE = 10
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(2)
+        ]
+        for idx in range(25):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000 + idx % 2,
+                category=category
+            )
+            GenreTitle.objects.bulk_create(
+                GenreTitle(genre=genre, piece=title) for genre in genres
+            )
+
+        url = f'{self.TITLES_URL}export/'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        with django_assert_max_num_queries(6):
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        titles = [json.loads(line) for line in lines]
+        assert len(titles) == 25, (
+            f'Проверьте, что `{url}` выгружает все произведения, по одному '
+            'в строке.'
+        )
+        assert titles[0] == client.get(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        ).json()
+        assert all(len(title['genre']) == len(genres) for title in titles)
+
+        response = client.get(url, {'year': 2001})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 12, (
+            f'Проверьте, что `{url}` учитывает фильтры списка произведений.'
+        )
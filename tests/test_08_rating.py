@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08RatingAggregates:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def test_01_rating_follows_review_changes(self, admin_client, user_client,
+                                              user, moderator_client,
+                                              moderator):
+        reviews, titles = create_reviews(
+            admin_client, {user: user_client}
+        )
+        title_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        create_single_review(moderator_client, titles[0]['id'], 'Так', 8)
+        assert admin_client.get(title_url).json()['rating'] == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        response = user_client.patch(review_url, data={'score': 10})
+        assert response.status_code == HTTPStatus.OK
+        assert admin_client.get(title_url).json()['rating'] == 9, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        response = user_client.delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(title_url).json()['rating'] == 8, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+    def test_02_rebuild_ratings_command(self, admin_client, user_client,
+                                        user):
+        from reviews.models import Title
+
+        _, titles = create_reviews(admin_client, {user: user_client})
+        call_command('rebuild_ratings', '--check')
+
+        Title.objects.filter(pk=titles[0]['id']).update(
+            reviews_count=0, score_sum=0, rating=None
+        )
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.reviews_count, title.score_sum, title.rating) == (
+            1, 5, 5
+        ), 'Команда `rebuild_ratings` должна восстанавливать агрегаты.'
+        call_command('rebuild_ratings', '--check')
+
+    def test_03_rating_follows_user_delete(self, admin_client, user_client,
+                                           user, moderator_client,
+                                           moderator):
+        from reviews.ratings import find_rating_drift
+
+        _, titles = create_reviews(admin_client, {user: user_client})
+        create_single_review(moderator_client, titles[0]['id'], 'Так', 8)
+        create_single_review(user_client, titles[1]['id'], 'Ещё', 3)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        assert admin_client.get(title_url).json()['rating'] == 8, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении автора отзыва.'
+        )
+        title_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[1]['id']
+        )
+        assert admin_client.get(title_url).json()['rating'] is None
+        assert not find_rating_drift().exists(), (
+            'Проверьте, что после удаления пользователя агрегаты '
+            'произведений совпадают с отзывами.'
+        )
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+
+def walk_cursor_pages(client, url):
+    results = []
+    next_url = f'{url}?cursor='
+    while next_url:
+        response = client.get(next_url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` с параметром `cursor` '
+            'возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            f'Проверьте, что в курсорном режиме `{url}` не считает '
+            'общее количество объектов.'
+        )
+        results.extend(data['results'])
+        next_url = data['next']
+    return results
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09Pagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def create_titles(self, count):
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Фильм', slug='films')
+        return [
+            Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            for idx in range(count)
+        ]
+
+    def test_01_titles_cursor_mode(self, client):
+        titles = self.create_titles(25)
+        results = walk_cursor_pages(client, self.TITLES_URL)
+        assert [title['id'] for title in results] == [
+            title.pk for title in titles
+        ], (
+            f'Проверьте, что курсорный режим `{self.TITLES_URL}` отдаёт все '
+            'произведения ровно один раз в порядке `id`.'
+        )
+
+        response = client.get(self.TITLES_URL)
+        assert response.json()['count'] == len(titles), (
+            f'Проверьте, что без параметра `cursor` `{self.TITLES_URL}` '
+            'сохраняет постраничный режим с ключом `count`.'
+        )
+
+    def test_02_reviews_cursor_tiebreaker(self, client, django_user_model):
+        from reviews.models import Review
+
+        title = self.create_titles(1)[0]
+        for idx in range(23):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5
+            )
+        Review.objects.update(pub_date=timezone.now())
+
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.pk)
+        ids = [review['id'] for review in walk_cursor_pages(client, url)]
+        assert ids == sorted(ids, reverse=True) and len(ids) == 23, (
+            f'Проверьте, что курсорный режим `{url}` устойчиво упорядочивает '
+            'отзывы с одинаковой датой публикации.'
+        )
+
+    def test_03_cached_count(self, client, django_assert_num_queries):
+        from reviews.models import Title
+
+        titles = self.create_titles(3)
+        with django_assert_num_queries(4):
+            assert client.get(self.TITLES_URL).json()['count'] == 3
+        with django_assert_num_queries(3):
+            assert client.get(self.TITLES_URL).json()['count'] == 3, (
+                f'Проверьте, что `{self.TITLES_URL}` берёт общее количество '
+                'объектов из кеша, не выполняя COUNT(*).'
+            )
+
+        Title.objects.bulk_create(
+            Title(name='Без сигналов', year=2000, category=titles[0].category)
+            for _ in range(2)
+        )
+        assert client.get(self.TITLES_URL).json()['count'] == 3
+        response = client.get(f'{self.TITLES_URL}?count=exact')
+        assert response.json()['count'] == 5, (
+            f'Проверьте, что `{self.TITLES_URL}?count=exact` возвращает '
+            'точное количество объектов.'
+        )
+        assert client.get(self.TITLES_URL).json()['count'] == 5
+
+        titles[0].delete()
+        assert client.get(self.TITLES_URL).json()['count'] == 4, (
+            'Проверьте, что удаление объекта сбрасывает закешированное '
+            'количество.'
+        )
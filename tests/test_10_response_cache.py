@@ -0,0 +1,166 @@
+from http import HTTPStatus
+
+import pytest
+from django.db.models import F
+from django.utils.http import parse_http_date
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    GENRES_URL = '/api/v1/genres/'
+
+    @pytest.fixture(autouse=True)
+    def response_cache(self, settings):
+        settings.RESPONSE_CACHE_TIMEOUT = 300
+
+    def test_01_repeated_get_served_from_cache(self, client, admin_client,
+                                               django_assert_num_queries):
+        create_titles(admin_client)
+        first = client.get(self.TITLES_URL)
+        assert first['X-Cache'] == 'MISS'
+        # Единственный запрос — общие для процессов версии моделей.
+        with django_assert_num_queries(1):
+            second = client.get(self.TITLES_URL)
+        assert second.status_code == HTTPStatus.OK
+        assert second['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET-запрос к `{self.TITLES_URL}` '
+            'обслуживается из кеша.'
+        )
+        assert second.json() == first.json()
+
+    def test_02_writes_invalidate_cache(self, client, admin_client,
+                                        user_client):
+        titles, _, genres = create_titles(admin_client)
+        detail_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        assert client.get(detail_url).json()['rating'] is None
+        client.get(self.GENRES_URL)
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        response = client.get(detail_url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кеш ответа с рейтингом '
+            'произведения.'
+        )
+
+        admin_client.delete(f'{self.GENRES_URL}{genres[0]["slug"]}/')
+        response = client.get(self.GENRES_URL)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == len(genres) - 1, (
+            'Проверьте, что удаление жанра сбрасывает кеш списка жанров.'
+        )
+        response = client.get(detail_url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что удаление жанра сбрасывает кеш произведений.'
+        )
+
+    def test_03_conditional_get(self, client, admin_client, user_client,
+                                django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        for url in (self.TITLES_URL, self.GENRES_URL, reviews_url):
+            response = client.get(url)
+            etag = response['ETag']
+            assert etag and response['Last-Modified'], (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовки `ETag` и `Last-Modified`.'
+            )
+            with django_assert_num_queries(1):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+            response = client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с полученным от '
+                'сервера `Last-Modified` в `If-Modified-Since` возвращает '
+                'ответ со статусом 304.'
+            )
+
+        etag = client.get(reviews_url)['ETag']
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после нового отзыва условный GET-запрос к '
+            f'`{reviews_url}` возвращает обновлённые данные.'
+        )
+        assert response['ETag'] != etag
+
+    def test_04_write_in_same_second(self, client, admin_client):
+        from reviews.models import Genre, ModelVersion
+
+        from api.cache import bump_model_versions
+
+        create_titles(admin_client)
+        response = client.get(self.GENRES_URL)
+        last_modified = response['Last-Modified']
+        # Запись другого процесса в ту же секунду, что и выданный
+        # Last-Modified: версия и время изменения есть только в базе.
+        bump_model_versions([Genre])
+        Genre.objects.filter(slug='horror').update(name='Триллер')
+        assert ModelVersion.objects.get(
+            label='reviews.genre'
+        ).modified.timestamp() > parse_http_date(last_modified)
+        response = client.get(
+            self.GENRES_URL, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что запись в ту же секунду, что и `Last-Modified`, '
+            'не даёт ответа 304 на `If-Modified-Since`.'
+        )
+        assert 'Триллер' in [genre['name'] for genre in response.json()[
+            'results'
+        ]], (
+            'Проверьте, что изменение версии в базе другим процессом '
+            'сбрасывает кеш ответа.'
+        )
+        assert response['Last-Modified'] != last_modified
+
+    def test_05_query_string_in_key(self, client, admin_client):
+        create_titles(admin_client)
+        assert client.get(self.TITLES_URL)['X-Cache'] == 'MISS'
+        for query in ('?page=1', '?format=json', '?count=exact'):
+            response = client.get(f'{self.TITLES_URL}{query}')
+            assert response['X-Cache'] == 'MISS', (
+                f'Проверьте, что ответ на `{self.TITLES_URL}{query}` '
+                'кешируется отдельно от ответа без параметров.'
+            )
+            assert client.get(
+                f'{self.TITLES_URL}{query}'
+            )['X-Cache'] == 'HIT'
+
+    def test_06_other_process_write(self, client, admin_client):
+        from reviews.models import ModelVersion, Title
+
+        create_titles(admin_client)
+        client.get(self.TITLES_URL)
+        # Другой процесс меняет только общую версию в базе, его
+        # локальный кеш этому процессу не виден.
+        ModelVersion.objects.filter(label='reviews.title').update(
+            version=F('version') + 1
+        )
+        assert client.get(self.TITLES_URL)['X-Cache'] == 'MISS', (
+            'Проверьте, что запись другого процесса сбрасывает кеш ответа '
+            'этого процесса.'
+        )
+
+    def test_07_disabled(self, client, admin_client, settings):
+        create_titles(admin_client)
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+        client.get(self.GENRES_URL)
+        response = client.get(self.GENRES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert 'X-Cache' not in response, (
+            'Проверьте, что нулевой RESPONSE_CACHE_TIMEOUT отключает кеш '
+            'ответов.'
+        )
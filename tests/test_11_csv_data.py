@@ -0,0 +1,227 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+
+def csv_rows(filename):
+    path = settings.BASE_DIR / 'static' / 'data' / filename
+    with open(path, encoding='utf-8', newline='') as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CsvData:
+
+    def test_01_load_order_follows_foreign_keys(self):
+        from reviews.csv_data import DATA_NAMES, load_order
+        from reviews.models import Comment, GenreTitle, Review, Title, User
+
+        order = load_order(DATA_NAMES)
+        for model, dependencies in (
+            (Title, ()),
+            (GenreTitle, (Title,)),
+            (Review, (Title, User)),
+            (Comment, (Review, User)),
+        ):
+            for dependency in dependencies:
+                assert order.index(dependency) < order.index(model), (
+                    f'Модель {dependency.__name__} должна загружаться '
+                    f'раньше {model.__name__}.'
+                )
+
+    def test_02_load_csv_data(self):
+        from reviews.csv_data import DATA_NAMES
+        from reviews.models import Comment, Title
+
+        out = StringIO()
+        call_command('load_csv_data', batch_size=7, stdout=out)
+        for model, filename in DATA_NAMES.items():
+            assert model.objects.count() == len(csv_rows(filename)), (
+                f'Проверьте, что `load_csv_data` загружает все строки '
+                f'из {filename}.'
+            )
+
+        row = csv_rows('comments.csv')[0]
+        comment = Comment.objects.get(pk=row['id'])
+        assert str(comment.author_id) == row['author']
+        assert str(comment.review_id) == row['review_id']
+
+        call_command('rebuild_ratings', '--check', stdout=out)
+        assert Title.objects.filter(rating__isnull=False).exists(), (
+            'Проверьте, что после загрузки отзывов пересчитываются рейтинги.'
+        )
+
+    def test_03_load_with_deferred_indexes(self):
+        from django.db import connection
+        from reviews.csv_data import DATA_NAMES
+        from reviews.models import Review
+
+        def index_names():
+            with connection.cursor() as cursor:
+                return {
+                    name: info['columns']
+                    for model in DATA_NAMES
+                    for name, info in connection.introspection.get_constraints(
+                        cursor, model._meta.db_table
+                    ).items()
+                    if info['index']
+                }
+
+        indexes_before = index_names()
+        out = StringIO()
+        call_command(
+            'load_csv_data', '--defer-indexes', batch_size=50, stdout=out
+        )
+        assert index_names() == indexes_before, (
+            'Проверьте, что `load_csv_data --defer-indexes` пересоздаёт '
+            'снятые на время загрузки индексы.'
+        )
+        assert Review.objects.count() == len(csv_rows('review.csv'))
+        assert 'Индексы и ограничения пересозданы.' in out.getvalue()
+
+    def test_04_upsert_writes_only_changes(self):
+        from reviews.csv_data import DATA_NAMES
+        from reviews.models import Genre, Review, Title
+
+        call_command('load_csv_data', stdout=StringIO())
+        title = Title.objects.order_by('pk').first()
+        Title.objects.filter(pk=title.pk).update(name='Изменено')
+        genre = Genre.objects.order_by('pk').last()
+        Genre.objects.filter(pk=genre.pk).delete()
+        review = Review.objects.order_by('pk').first()
+        Review.objects.filter(pk=review.pk).update(score=1)
+
+        out = StringIO()
+        call_command('load_csv_data', '--upsert', '--dry-run', stdout=out)
+        assert 'Title: добавлено 0, обновлено 1' in out.getvalue(), (
+            'Проверьте, что `load_csv_data --upsert --dry-run` сообщает '
+            'об изменённых строках.'
+        )
+        assert Title.objects.get(pk=title.pk).name == 'Изменено', (
+            'Проверьте, что пробный запуск не изменяет данные.'
+        )
+
+        out = StringIO()
+        call_command('load_csv_data', '--upsert', stdout=out)
+        output = out.getvalue()
+        assert 'Genre: добавлено 1, обновлено 0' in output
+        assert 'Review: добавлено 0, обновлено 1' in output
+        assert Title.objects.get(pk=title.pk).name == title.name, (
+            'Проверьте, что `load_csv_data --upsert` обновляет изменённые '
+            'строки.'
+        )
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+
+        out = StringIO()
+        call_command('load_csv_data', '--upsert', stdout=out)
+        assert out.getvalue().count('добавлено 0, обновлено 0') == len(
+            DATA_NAMES
+        ), (
+            'Проверьте, что повторный `load_csv_data --upsert` ничего не '
+            'изменяет.'
+        )
+
+    def test_05_dump_data_round_trip(self, tmp_path):
+        import gzip
+        import json
+
+        from reviews.csv_data import DATA_NAMES
+
+        call_command('load_csv_data', stdout=StringIO())
+        call_command('dump_data', output=str(tmp_path), stdout=StringIO())
+        for model, filename in DATA_NAMES.items():
+            with open(tmp_path / filename, encoding='utf-8',
+                      newline='') as dumped:
+                rows = list(csv.DictReader(dumped))
+            source = csv_rows(filename)
+            assert len(rows) == len(source), (
+                f'Проверьте, что `dump_data` выгружает все строки {filename}.'
+            )
+            assert set(source[0]) <= set(rows[0]), (
+                f'Проверьте, что `dump_data` сохраняет колонки {filename}.'
+            )
+
+        out = StringIO()
+        call_command(
+            'load_csv_data', '--upsert', '--dry-run',
+            data_dir=str(tmp_path), stdout=out,
+        )
+        assert out.getvalue().count('добавлено 0, обновлено 0') == len(
+            DATA_NAMES
+        ), 'Выгрузка `dump_data` должна загружаться обратно без изменений.'
+
+        call_command(
+            'dump_data', '--gzip', output=str(tmp_path), format='jsonl',
+            stdout=StringIO(),
+        )
+        with gzip.open(tmp_path / 'review.jsonl.gz', 'rt',
+                       encoding='utf-8') as dumped:
+            reviews = [json.loads(line) for line in dumped]
+        assert len(reviews) == len(csv_rows('review.csv'))
+        assert set(reviews[0]) == set(csv_rows('review.csv')[0])
+
+    def test_06_parallel_load_errors(self):
+        from unittest import mock
+
+        from django.core.management import CommandError
+        from django.db import OperationalError
+
+        with pytest.raises(CommandError, match='--parallel'):
+            call_command('load_csv_data', parallel=2, stdout=StringIO())
+
+        with mock.patch(
+            'reviews.management.commands.load_csv_data.load_model',
+            side_effect=OperationalError('database is locked'),
+        ), pytest.raises(CommandError, match='database is locked'):
+            call_command('load_csv_data', stdout=StringIO())
+
+    def test_07_dump_nulls(self, tmp_path):
+        import json
+
+        from reviews.models import Title
+
+        Title.objects.create(name='Без описания', year=2000)
+        call_command(
+            'dump_data', output=str(tmp_path), format='jsonl',
+            stdout=StringIO(),
+        )
+        with open(tmp_path / 'titles.jsonl', encoding='utf-8') as dumped:
+            title = json.loads(dumped.readline())
+        assert title['description'] is None and title['category'] is None, (
+            'Проверьте, что `dump_data --format jsonl` выгружает пустые '
+            'значения как null.'
+        )
+
+        call_command('dump_data', output=str(tmp_path), stdout=StringIO())
+        with open(tmp_path / 'titles.csv', encoding='utf-8',
+                  newline='') as dumped:
+            title = next(csv.DictReader(dumped))
+        assert title['description'] == '' and title['category'] == '', (
+            'Проверьте, что в CSV пустые значения выгружаются пустой '
+            'строкой.'
+        )
+
+    def test_08_dates_loaded_from_file(self, tmp_path):
+        from datetime import datetime, timezone
+
+        from reviews.models import Comment, Review
+
+        call_command('load_csv_data', stdout=StringIO())
+        assert Review.objects.get(pk=1).pub_date == datetime(
+            2019, 9, 24, 21, 8, 21, 567000, tzinfo=timezone.utc
+        ), 'Проверьте, что `load_csv_data` сохраняет pub_date из файла.'
+
+        call_command('dump_data', output=str(tmp_path), stdout=StringIO())
+        dates = dict(Comment.objects.values_list('pk', 'pub_date'))
+        Comment.objects.all().delete()
+        call_command(
+            'load_csv_data', '--upsert', data_dir=str(tmp_path),
+            stdout=StringIO(),
+        )
+        assert dict(Comment.objects.values_list('pk', 'pub_date')) == dates, (
+            'Проверьте, что выгрузка `dump_data` загружается обратно с '
+            'исходными датами.'
+        )
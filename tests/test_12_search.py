@@ -0,0 +1,113 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_comment, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Search:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_titles(self):
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Фильм', slug='films')
+        return [
+            Title.objects.create(
+                name=name, year=2000, category=category,
+                description=description
+            )
+            for name, description in (
+                ('Мир', 'Жизнь после войны.'),
+                ('Звёздные войны', 'Войны в далёкой галактике.'),
+                ('Любовь и голуби', 'Комедия о любви.'),
+            )
+        ]
+
+    def search_titles(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_titles_search_ranked(self, client):
+        self.create_titles()
+        assert self.search_titles(client, 'войны') == [
+            'Звёздные войны', 'Мир'
+        ], (
+            f'Проверьте, что `{self.TITLES_URL}?search=` ищет по названию '
+            'и описанию и ставит выше более релевантные произведения.'
+        )
+        assert self.search_titles(client, 'ГОЛУБ') == ['Любовь и голуби'], (
+            'Проверьте, что поиск не зависит от регистра и находит слова '
+            'по началу.'
+        )
+        assert self.search_titles(client, 'война "мир') == []
+        assert len(self.search_titles(client, '"*')) == 3, (
+            'Проверьте, что строка без слов не фильтрует произведения.'
+        )
+
+    def test_02_index_follows_changes(self, client, admin_client):
+        from reviews.models import Title
+
+        titles = self.create_titles()
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{titles[0].pk}/', data={'name': 'Перемирие'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.search_titles(client, 'перемирие') == ['Перемирие'], (
+            'Проверьте, что изменённое произведение находится поиском.'
+        )
+        admin_client.delete(f'{self.TITLES_URL}{titles[1].pk}/')
+        assert self.search_titles(client, 'галактике') == []
+
+        Title.objects.filter(pk=titles[2].pk).update(name='Гараж')
+        assert self.search_titles(client, 'гараж') == []
+        call_command('rebuild_search_index', stdout=StringIO())
+        assert self.search_titles(client, 'гараж') == ['Гараж'], (
+            'Проверьте, что `rebuild_search_index` перестраивает индекс.'
+        )
+
+    def test_03_reviews_and_comments_search(self, client, user_client,
+                                            moderator_client):
+        titles = self.create_titles()
+        title_id = titles[0].pk
+        reviews_url = f'{self.TITLES_URL}{title_id}/reviews/'
+        first = create_single_review(
+            user_client, title_id, 'Сильный фильм о войне', 9
+        ).json()
+        create_single_review(
+            moderator_client, title_id, 'Скучные диалоги', 4
+        )
+        response = client.get(reviews_url, {'search': 'диалоги'})
+        assert [
+            review['text'] for review in response.json()['results']
+        ] == ['Скучные диалоги'], (
+            f'Проверьте, что `{reviews_url}?search=` ищет по тексту отзывов.'
+        )
+
+        comments_url = f'{reviews_url}{first["id"]}/comments/'
+        create_single_comment(
+            moderator_client, title_id, first['id'], 'Согласен полностью'
+        )
+        create_single_comment(
+            user_client, title_id, first['id'], 'Спасибо'
+        )
+        response = client.get(comments_url, {'search': 'согласен'})
+        assert [
+            comment['text'] for comment in response.json()['results']
+        ] == ['Согласен полностью'], (
+            f'Проверьте, что `{comments_url}?search=` ищет по тексту '
+            'комментариев.'
+        )
+
+    def test_04_benchmark_search(self):
+        self.create_titles()
+        out = StringIO()
+        call_command('benchmark_search', 'войны', repeat=2, stdout=out)
+        output = out.getvalue()
+        assert 'Title «войны» contains: найдено 2' in output
+        assert 'Title «войны» fts: найдено 2' in output
@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Suggest:
+
+    SUGGEST_URL = '/api/v1/titles/suggest/'
+
+    def suggest(self, client, query):
+        response = client.get(self.SUGGEST_URL, {'q': query})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.SUGGEST_URL}` возвращает '
+            'ответ со статусом 200.'
+        )
+        return response.json()['results']
+
+    def test_01_suggest_by_prefix(self, client, admin_client,
+                                  django_assert_num_queries):
+        titles, categories, genres = create_titles(admin_client)
+        title = titles[0]
+        assert {'type': 'title', 'id': title['id'], 'name': title['name']} in (
+            self.suggest(client, title['name'][:3].upper())
+        ), (
+            f'Проверьте, что `{self.SUGGEST_URL}?q=` находит произведения '
+            'по началу названия без учёта регистра.'
+        )
+        last_word = title['name'].split()[-1]
+        assert title['name'] in [
+            item['name'] for item in self.suggest(client, last_word)
+        ], 'Проверьте, что подсказки находят названия по началу слова.'
+
+        genre = genres[0]
+        # Версии моделей только что сверены: ни одного запроса к базе.
+        with django_assert_num_queries(0):
+            found = self.suggest(client, genre['name'])
+        assert {
+            'type': 'genre', 'slug': genre['slug'], 'name': genre['name']
+        } in found, (
+            f'Проверьте, что `{self.SUGGEST_URL}` подсказывает жанры и не '
+            'перестраивает индекс, пока он актуален.'
+        )
+        category = categories[0]
+        assert {
+            'type': 'category', 'slug': category['slug'],
+            'name': category['name']
+        } in self.suggest(client, category['name'])
+        assert self.suggest(client, '  ') == []
+
+    def test_02_index_follows_changes(self, client, admin_client,
+                                      django_assert_num_queries):
+        from reviews.models import Genre
+        from reviews.signals import models_bulk_changed
+
+        titles, _, genres = create_titles(admin_client)
+        self.suggest(client, 'а')
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Ёжик'}
+        )
+        admin_client.delete(f'/api/v1/genres/{genres[0]["slug"]}/')
+        # Изменения своего процесса применены по сигналам.
+        with django_assert_num_queries(0):
+            assert [item['name'] for item in self.suggest(client, 'еж')] == [
+                'Ёжик'
+            ], 'Проверьте, что подсказки учитывают изменённые названия.'
+            assert genres[0]['name'] not in [
+                item['name'] for item in self.suggest(client, genres[0]['name'])
+            ], 'Проверьте, что удалённый жанр пропадает из подсказок.'
+
+        Genre.objects.update(name='Пакетный жанр')
+        models_bulk_changed.send(sender=Genre, models=[Genre])
+        assert len(self.suggest(client, 'пакетный')) == len(genres) - 1, (
+            'Проверьте, что после массового изменения индекс подсказок '
+            'перестраивается.'
+        )
+
+    def test_03_other_process_change(self, client, admin_client, settings,
+                                     django_assert_num_queries):
+        from django.db.models import F
+
+        from reviews.models import Genre, ModelVersion
+
+        settings.SUGGEST_VERSION_CHECK_INTERVAL = 60
+        _, _, genres = create_titles(admin_client)
+        self.suggest(client, 'а')
+        # Запись другого процесса: сигналы этого процесса её не видят,
+        # меняются только строки и общая версия в базе.
+        Genre.objects.filter(slug=genres[0]['slug']).update(name='Чужой жанр')
+        ModelVersion.objects.filter(label='reviews.genre').update(
+            version=F('version') + 1
+        )
+        with django_assert_num_queries(0):
+            assert self.suggest(client, 'чужой') == [], (
+                'Проверьте, что подсказки сверяют версии моделей с базой не '
+                'чаще SUGGEST_VERSION_CHECK_INTERVAL.'
+            )
+        settings.SUGGEST_VERSION_CHECK_INTERVAL = 0
+        with django_assert_num_queries(2):
+            found = self.suggest(client, 'чужой')
+        assert [item['slug'] for item in found] == [genres[0]['slug']], (
+            'Проверьте, что подсказки учитывают изменения из других '
+            'процессов и перечитывают только изменившуюся модель.'
+        )
@@ -0,0 +1,111 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+# Версии моделей читаются целиком: в таблице по строке на модель.
+WHOLE_TABLE_READS = {'reviews_modelversion'}
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+def query_plans(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    plans = []
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+            plans.append(
+                (query['sql'], [row[-1] for row in cursor.fetchall()])
+            )
+    return plans
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Планы запросов проверяются для SQLite.'
+)
+@pytest.mark.django_db(transaction=True)
+class Test14QueryPlans:
+
+    def create_data(self, django_user_model):
+        from reviews.models import (Category, Comment, Genre, GenreTitle,
+                                    Review, Title)
+
+        category = Category.objects.create(name='Фильм', slug='films')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(3)
+        ]
+        titles = []
+        for idx in range(5):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000 + idx,
+                category=category
+            )
+            GenreTitle.objects.create(genre=genre, piece=title)
+            titles.append(title)
+        reviews = [
+            Review.objects.create(
+                title=titles[0], author=author, text='Отзыв', score=5
+            )
+            for author in authors
+        ]
+        for author in authors:
+            Comment.objects.create(
+                review=reviews[0], author=author, text='Комментарий'
+            )
+        return titles[0], reviews[0]
+
+    def test_01_list_endpoints_use_indexes(self, client, django_user_model):
+        title, review = self.create_data(django_user_model)
+        reviews_url = f'/api/v1/titles/{title.pk}/reviews/'
+        urls = (
+            '/api/v1/titles/?year=2000',
+            '/api/v1/titles/?genre=drama',
+            '/api/v1/titles/?category=films',
+            f'/api/v1/titles/{title.pk}/',
+            reviews_url,
+            f'{reviews_url}?cursor=',
+            f'{reviews_url}{review.pk}/comments/',
+            f'{reviews_url}{review.pk}/comments/?cursor=',
+        )
+        for url in urls:
+            for sql, plan in query_plans(client, url):
+                scans = [
+                    step for step in plan if FULL_SCAN.match(step)
+                    and FULL_SCAN.match(step)[1] not in WHOLE_TABLE_READS
+                ]
+                assert not scans, (
+                    f'Проверьте индексы: запрос к `{url}` читает таблицу '
+                    f'целиком ({scans}).\n{sql}'
+                )
+
+    def test_02_child_lists_ordered_by_index(self, client,
+                                             django_user_model):
+        title, review = self.create_data(django_user_model)
+        reviews_url = f'/api/v1/titles/{title.pk}/reviews/'
+        for url in (
+            reviews_url,
+            f'{reviews_url}?cursor=',
+            f'{reviews_url}{review.pk}/comments/',
+            f'{reviews_url}{review.pk}/comments/?cursor=',
+        ):
+            for sql, plan in query_plans(client, url):
+                if ' ORDER BY ' not in sql:
+                    continue
+                assert not any(TEMP_SORT in step for step in plan), (
+                    f'Проверьте, что порядок отзывов и комментариев в '
+                    f'`{url}` берётся из индекса, без сортировки.\n{sql}'
+                )
@@ -0,0 +1,146 @@
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from rest_framework.test import APIClient
+
+from tests.budgets import Budget, measure, seed_catalogue, violations
+
+TITLE = '/api/v1/titles/{title}/'
+REVIEWS = f'{TITLE}reviews/'
+COMMENTS = f'{REVIEWS}{{review}}/comments/'
+BUDGETS = (
+    Budget('titles-list', 'get', '/api/v1/titles/', 4, 150),
+    Budget('titles-list', 'get', '/api/v1/titles/?genre={genre}', 4, 150),
+    Budget('titles-list', 'get', '/api/v1/titles/?search=произведение', 4,
+           150),
+    Budget('titles-list', 'post', '/api/v1/titles/', 14, 150, 201, {
+        'name': 'Новое произведение', 'year': 2000, 'genre': ['drama'],
+        'category': 'films',
+    }),
+    Budget('titles-bulk-create', 'post', '/api/v1/titles/bulk/', 12, 150, 201, [
+        {'name': f'Пакетное произведение {idx}', 'year': 2000,
+         'genre': ['drama', 'comedy'], 'category': 'films'}
+        for idx in range(20)
+    ], 'json'),
+    Budget('titles-detail', 'get', TITLE, 3, 100),
+    Budget(
+        'titles-export', 'get', '/api/v1/titles/export/',
+        lambda values: 2 * (
+            values['titles'] // settings.EXPORT_CHUNK_SIZE + 1
+        ) + 1,
+        2000,
+    ),
+    Budget('titles-suggest', 'get', '/api/v1/titles/suggest/?q=произв', 4,
+           1000),
+    Budget('genres-list', 'get', '/api/v1/genres/', 3, 100),
+    Budget('genres-detail', 'delete', '/api/v1/genres/{genre}/', 7, 150,
+           204),
+    Budget('categories-list', 'get', '/api/v1/categories/', 3, 100),
+    Budget('categories-detail', 'delete', '/api/v1/categories/{category}/',
+           9, 150, 204),
+    Budget('reviews-list', 'get', REVIEWS, 4, 150),
+    Budget('reviews-list', 'get', f'{REVIEWS}?cursor=', 3, 150),
+    Budget('reviews-list', 'post', REVIEWS, 9, 150, 201, {
+        'text': 'Отзыв администратора', 'score': 7,
+    }),
+    Budget('reviews-detail', 'get', f'{REVIEWS}{{review}}/', 3, 100),
+    Budget('comments-list', 'get', COMMENTS, 5, 150),
+    Budget('comments-list', 'post', COMMENTS, 7, 150, 201, {
+        'text': 'Комментарий администратора',
+    }),
+    Budget('comments-detail', 'get', f'{COMMENTS}{{comment}}/', 4, 100),
+    Budget('user-list', 'get', '/api/v1/users/', 3, 100),
+    Budget('user-detail', 'get', '/api/v1/users/{username}/', 2, 100),
+    Budget('user-about-me', 'get', '/api/v1/users/me/', 2, 100),
+    Budget('auth-signup', 'post', '/api/v1/auth/signup/', 7, 100, 200, {
+        'username': 'budget_signup', 'email': 'budget_signup@yamdb.fake',
+    }),
+    Budget('auth-token', 'post', '/api/v1/auth/token/', 3, 100, 400, {
+        'username': 'budget_signup', 'confirmation_code': 'invalid',
+    }),
+    # Модерация идёт последней: она скрывает и удаляет засеянные объекты.
+    Budget('comments-bulk-hide', 'post', f'{COMMENTS}bulk-hide/', 3, 150,
+           200, lambda values: {'ids': [values['comment']]}),
+    Budget('comments-bulk-delete', 'post', f'{COMMENTS}bulk-delete/', 5,
+           150, 200, lambda values: {'ids': [values['comment'] + 1]}),
+    Budget('moderation-comments-bulk-hide', 'post',
+           '/api/v1/moderation/comments/bulk-hide/', 3, 150, 200,
+           lambda values: {'ids': [values['comment'] + 2]}),
+    Budget('moderation-comments-bulk-delete', 'post',
+           '/api/v1/moderation/comments/bulk-delete/', 5, 150, 200,
+           lambda values: {'ids': [values['comment'] + 3]}),
+    Budget('reviews-bulk-hide', 'post', f'{REVIEWS}bulk-hide/', 7, 150, 200,
+           lambda values: {'ids': [values['review'] + 1]}),
+    Budget('reviews-bulk-delete', 'post', f'{REVIEWS}bulk-delete/', 10, 150,
+           200, lambda values: {'ids': [values['review'] + 2]}),
+    Budget('moderation-reviews-bulk-hide', 'post',
+           '/api/v1/moderation/reviews/bulk-hide/', 7, 150, 200,
+           lambda values: {'ids': [values['review'] + 3]}),
+    Budget('moderation-reviews-bulk-delete', 'post',
+           '/api/v1/moderation/reviews/bulk-delete/', 10, 150, 200,
+           lambda values: {'ids': [values['review'] + 4]}),
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Budgets:
+
+    def test_01_every_route_has_budget(self):
+        from api.urls import v1_router
+
+        routes = {pattern.name for pattern in v1_router.urls} - {'api-root'}
+        missing = routes - {budget.route for budget in BUDGETS}
+        assert not missing, (
+            f'Добавьте бюджеты запросов для маршрутов: {sorted(missing)}.'
+        )
+
+    def test_02_routes_within_budget(self, admin):
+        from api.authentication import access_token_for
+
+        # Токен с claims, как от auth/token: аутентификация без запросов.
+        admin_client = APIClient()
+        admin_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {access_token_for(admin)}'
+        )
+        values = seed_catalogue()
+        failures = []
+        for budget in BUDGETS:
+            measurement = measure(admin_client, budget, values)
+            failures.extend(
+                f'{budget.method.upper()} {measurement.url}: {problem}'
+                for problem in violations(measurement)
+            )
+        assert not failures, (
+            'Проверьте производительность эндпоинтов, бюджеты превышены:\n'
+            + '\n'.join(failures)
+        )
+
+    def test_03_category_delete_does_not_grow(self, admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Category, Title
+
+        counts = []
+        # Первое удаление заводит версии моделей и не учитывается.
+        for size in (0, 1, 250):
+            category = Category.objects.create(
+                name=f'Категория {size}', slug=f'category-{size}'
+            )
+            Title.objects.bulk_create(
+                Title(name=f'Произведение {idx}', year=2000,
+                      category=category)
+                for idx in range(size)
+            )
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.delete(
+                    f'/api/v1/categories/{category.slug}/'
+                )
+            assert response.status_code == HTTPStatus.NO_CONTENT
+            counts.append(len(context))
+        assert counts[1] == counts[2], (
+            'Проверьте, что число запросов при удалении категории не '
+            'зависит от числа её произведений.'
+        )
+        assert not Title.objects.filter(category__isnull=False).exists()
@@ -0,0 +1,79 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Benchmark:
+
+    def snapshot(self):
+        from reviews.models import Comment, GenreTitle, Review, Title
+
+        return (
+            list(Title.objects.order_by('pk').values_list(
+                'name', 'year', 'description'
+            )),
+            list(GenreTitle.objects.order_by('pk').values_list(
+                'piece__name', 'genre__name'
+            )),
+            list(Review.objects.order_by('pk').values_list(
+                'title__name', 'score', 'text'
+            )),
+            list(Comment.objects.order_by('pk').values_list('text')),
+        )
+
+    def test_01_generator_is_deterministic(self):
+        from benchmark.generator import generate_dataset
+        from reviews.models import Category, Genre, Review, Title, User
+
+        sizes = dict(users=30, titles=50, reviews=400, comments=200)
+        created = generate_dataset(**sizes)
+        first = self.snapshot()
+        assert created['Title'] == 50 and created['Comment'] == 200
+        assert created['Review'] == Review.objects.count() <= 400
+
+        for model in (Review, Title, Genre, Category, User):
+            model.objects.all().delete()
+        generate_dataset(**sizes)
+        assert self.snapshot() == first, (
+            'Проверьте, что генератор с одинаковыми аргументами создаёт '
+            'одинаковые данные.'
+        )
+
+    def test_02_reviews_follow_zipf(self):
+        from django.db.models import Count
+
+        from benchmark.generator import generate_dataset
+        from reviews.models import Title
+
+        generate_dataset(users=100, titles=100, reviews=2000, comments=0)
+        counts = list(Title.objects.order_by('pk').annotate(
+            total=Count('reviews')
+        ).values_list('total', flat=True))
+        assert counts[0] > 5 * counts[len(counts) // 2], (
+            'Проверьте, что отзывы распределяются по произведениям '
+            'неравномерно: первые произведения популярнее.'
+        )
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+
+    def test_03_run_benchmark(self):
+        from benchmark.workload import WORKLOAD
+
+        call_command(
+            'generate_benchmark_data', users=20, titles=30, reviews=200,
+            comments=100, stdout=StringIO()
+        )
+        out = StringIO()
+        call_command('run_benchmark', requests=60, stdout=out)
+        output = out.getvalue()
+        assert 'Всего 60 запросов' in output
+        for operation in WORKLOAD:
+            if operation.name in output:
+                line = next(
+                    line for line in output.splitlines()
+                    if line.startswith(operation.name)
+                )
+                assert line.split()[2] == '0', (
+                    f'Операция {operation.name} завершилась ошибками сервера.'
+                )
@@ -0,0 +1,81 @@
+import json
+import logging
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17RequestTiming:
+
+    TITLES_URL = '/api/v1/titles/'
+    SLOW_REQUESTS_URL = '/api/v1/debug/slow-requests/'
+
+    def test_01_server_timing_header(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        timing = {
+            metric.split(';')[0]: metric
+            for metric in response['Server-Timing'].split(', ')
+        }
+        assert set(timing) == {'db', 'serializer', 'view', 'total'}, (
+            'Проверьте, что ответ содержит заголовок `Server-Timing` со '
+            'временем запросов к базе, сериализации, представления и общим '
+            'временем.'
+        )
+        assert 'queries"' in timing['db'], (
+            'Проверьте, что в `Server-Timing` указано число SQL-запросов.'
+        )
+
+    def test_02_request_log(self, client, admin_client, caplog):
+        create_titles(admin_client)
+        caplog.clear()
+        with caplog.at_level(logging.INFO, logger='api.requests'):
+            client.get(self.TITLES_URL)
+        records = [
+            json.loads(record.getMessage()) for record in caplog.records
+            if record.name == 'api.requests'
+        ]
+        assert len(records) == 1, (
+            'Проверьте, что каждый запрос пишет одну строку в журнал '
+            '`api.requests`.'
+        )
+        record = records[0]
+        assert record['path'] == self.TITLES_URL
+        assert record['view'] == 'titles-list'
+        assert record['status'] == HTTPStatus.OK
+        assert record['queries'] > 0, (
+            'Проверьте, что в журнале запроса указано число SQL-запросов.'
+        )
+        assert record['serializer_ms'] > 0, (
+            'Проверьте, что в журнале запроса учтено время сериализации.'
+        )
+
+    def test_03_slow_requests(self, client, user_client, admin_client):
+        from api.middleware import clear_slow_requests
+
+        clear_slow_requests()
+        create_titles(admin_client)
+        client.get(self.TITLES_URL)
+        response = user_client.get(self.SLOW_REQUESTS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.SLOW_REQUESTS_URL}` недоступен '
+            'пользователю без прав администратора.'
+        )
+        response = admin_client.get(self.SLOW_REQUESTS_URL)
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        timings = [entry['total_ms'] for entry in results]
+        assert timings == sorted(timings, reverse=True), (
+            'Проверьте, что медленные запросы отсортированы по убыванию '
+            'времени.'
+        )
+        listing = [
+            entry for entry in results if entry['path'] == self.TITLES_URL
+        ]
+        assert listing and listing[0]['sql'], (
+            'Проверьте, что медленные запросы сохраняются вместе с их SQL.'
+        )
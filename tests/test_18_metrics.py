@@ -0,0 +1,131 @@
+import json
+import subprocess
+import sys
+from io import StringIO
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Metrics:
+
+    METRICS_URL = '/metrics'
+    TITLES_URL = '/api/v1/titles/'
+    SIGNUP_URL = '/api/v1/auth/signup/'
+
+    def scrape(self, client):
+        response = client.get(self.METRICS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что эндпоинт `{self.METRICS_URL}` доступен.'
+        )
+        assert response['Content-Type'].startswith('text/plain'), (
+            'Проверьте, что метрики отдаются в текстовом формате Prometheus.'
+        )
+        return response.content.decode()
+
+    def sample(self, text, prefix):
+        for line in text.splitlines():
+            if line.startswith(prefix + ' '):
+                return float(line.rsplit(' ', 1)[1])
+        return None
+
+    def test_01_request_metrics(self, client, admin_client):
+        admin_client.get(self.TITLES_URL)
+        admin_client.get(self.TITLES_URL)
+        text = self.scrape(client)
+        for name in (
+            'yamdb_request_duration_seconds', 'yamdb_request_db_queries',
+            'yamdb_cache_requests_total', 'yamdb_email_send_duration_seconds',
+            'yamdb_jwt_auth_duration_seconds',
+        ):
+            assert f'# TYPE {name} ' in text, (
+                f'Проверьте, что `{self.METRICS_URL}` описывает метрику '
+                f'`{name}`.'
+            )
+        count = self.sample(
+            text,
+            'yamdb_request_duration_seconds_count{view="TitlesViewSet.list"}'
+        )
+        assert count is not None and count >= 2, (
+            'Проверьте, что время ответа учитывается по представлению и '
+            'действию, например `TitlesViewSet.list`.'
+        )
+        assert self.sample(text, (
+            'yamdb_request_duration_seconds_bucket'
+            '{view="TitlesViewSet.list",le="+Inf"}'
+        )) == count, (
+            'Проверьте, что последняя корзина гистограммы содержит все '
+            'наблюдения.'
+        )
+        assert self.sample(
+            text, 'yamdb_jwt_auth_duration_seconds_count{outcome="ok"}'
+        ), 'Проверьте, что замеряется время проверки JWT-токена.'
+        for result in ('hit', 'miss'):
+            assert self.sample(text, (
+                'yamdb_cache_requests_total{cache="response",'
+                f'endpoint="titles-list",result="{result}"}}'
+            )), 'Проверьте, что учитываются попадания и промахи кеша.'
+
+    def test_02_email_metrics(self, client):
+        client.post(self.SIGNUP_URL, {
+            'username': 'metrics', 'email': 'metrics@yamdb.fake'
+        })
+        text = self.scrape(client)
+        assert self.sample(
+            text, 'yamdb_email_queue_depth{status="pending"}'
+        ) == 1, 'Проверьте, что метрики показывают длину очереди писем.'
+        call_command('send_queued_emails', stdout=StringIO())
+        text = self.scrape(client)
+        assert self.sample(
+            text, 'yamdb_email_send_duration_seconds_count{outcome="ok"}'
+        ), 'Проверьте, что замеряется время отправки письма с кодом.'
+
+    def test_03_processes_are_summed(self, client, tmp_path):
+        labels = [['cache', 'response'], ['endpoint', 'other-process'],
+                  ['result', 'hit']]
+        finished = subprocess.Popen([sys.executable, '-c', ''])
+        finished.wait()
+        running = [
+            subprocess.Popen([sys.executable, '-c', 'input()'],
+                             stdin=subprocess.PIPE)
+            for _ in range(2)
+        ]
+        try:
+            for process in running + [finished]:
+                (tmp_path / f'metrics-{process.pid}.json').write_text(
+                    json.dumps([['yamdb_cache_requests_total', labels, 3]])
+                )
+            text = self.scrape(client)
+        finally:
+            for process in running:
+                process.communicate(b'\n')
+        assert self.sample(text, (
+            'yamdb_cache_requests_total{cache="response",'
+            'endpoint="other-process",result="hit"}'
+        )) == 6, (
+            'Проверьте, что метрики из файлов разных процессов '
+            'складываются, а файлы завершившихся процессов не учитываются.'
+        )
+        assert not (tmp_path / f'metrics-{finished.pid}.json').exists(), (
+            'Проверьте, что файл завершившегося процесса удаляется.'
+        )
+
+    def test_04_process_file_removed(self, tmp_path):
+        from api.metrics import MetricsCollector
+
+        collector = MetricsCollector()
+        collector.path().write_text('[]')
+        collector.reset()
+        assert not collector.path().exists(), (
+            'Проверьте, что файл с pid процесса, оставшийся от прежнего '
+            'владельца, удаляется при запуске.'
+        )
+        collector.inc('yamdb_requests_total', {'status': 200})
+        collector.flush()
+        assert collector.path().exists()
+        collector.discard()
+        assert list(tmp_path.iterdir()) == [], (
+            'Проверьте, что процесс удаляет свой файл метрик при выходе.'
+        )
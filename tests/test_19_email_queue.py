@@ -0,0 +1,140 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+from smtplib import SMTPException
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19EmailQueue:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+
+    def signup(self, client, username='queued'):
+        response = client.post(self.SIGNUP_URL, {
+            'username': username, 'email': f'{username}@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        return response
+
+    def drain(self, **options):
+        call_command('send_queued_emails', stdout=StringIO(), **options)
+
+    def test_01_signup_enqueues_email(self, client):
+        from reviews.models import OutgoingEmail
+
+        outbox_before = len(mail.outbox)
+        self.signup(client)
+        assert len(mail.outbox) == outbox_before, (
+            f'Проверьте, что POST-запрос к `{self.SIGNUP_URL}` не отправляет '
+            'письмо сам, а ставит его в очередь.'
+        )
+        assert OutgoingEmail.objects.filter(
+            recipient='queued@yamdb.fake'
+        ).exists(), 'Проверьте, что письмо с кодом записано в очередь.'
+
+        self.drain()
+        assert len(mail.outbox) == outbox_before + 1, (
+            'Проверьте, что команда `send_queued_emails` отправляет письма '
+            'из очереди.'
+        )
+        assert mail.outbox[-1].to == ['queued@yamdb.fake']
+        assert not OutgoingEmail.objects.exists(), (
+            'Проверьте, что отправленные письма удаляются из очереди.'
+        )
+
+    def test_02_batches_share_connection(self, client):
+        from django.core.mail.backends.locmem import EmailBackend
+
+        for idx in range(5):
+            self.signup(client, f'batch{idx}')
+        with mock.patch.object(
+            EmailBackend, 'open', autospec=True, return_value=True
+        ) as opened:
+            self.drain(batch_size=2)
+        assert opened.call_count == 3, (
+            'Проверьте, что письма одной пачки отправляются через одно '
+            'соединение с почтовым бэкендом.'
+        )
+
+    def test_03_retries_with_backoff(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_QUEUE_MAX_ATTEMPTS = 2
+        self.signup(client)
+        started = timezone.now()
+        with mock.patch(
+            'django.core.mail.EmailMessage.send',
+            side_effect=SMTPException('Сервер недоступен'),
+        ):
+            self.drain()
+            email = OutgoingEmail.objects.get()
+            assert email.status == OutgoingEmail.PENDING
+            assert email.attempts == 1
+            assert email.send_after >= started + timedelta(
+                seconds=settings.EMAIL_QUEUE_RETRY_DELAY
+            ), (
+                'Проверьте, что после ошибки отправки письмо откладывается '
+                'на EMAIL_QUEUE_RETRY_DELAY секунд.'
+            )
+            assert 'Сервер недоступен' in email.last_error
+
+            OutgoingEmail.objects.update(send_after=timezone.now())
+            self.drain()
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.FAILED, (
+            'Проверьте, что после EMAIL_QUEUE_MAX_ATTEMPTS неудачных попыток '
+            'письмо больше не отправляется.'
+        )
+        outbox_before = len(mail.outbox)
+        self.drain()
+        assert len(mail.outbox) == outbox_before
+
+    def test_04_failed_emails_redacted_and_pruned(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_QUEUE_MAX_ATTEMPTS = 1
+        self.signup(client)
+        with mock.patch(
+            'django.core.mail.EmailMessage.send',
+            side_effect=SMTPException('Сервер недоступен'),
+        ):
+            self.drain()
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.FAILED
+        assert email.body == '', (
+            'Проверьте, что у окончательно не отправленного письма стирается '
+            'текст с кодом подтверждения.'
+        )
+
+        OutgoingEmail.objects.update(
+            created=timezone.now() - timedelta(
+                seconds=settings.EMAIL_QUEUE_FAILED_TTL + 1
+            )
+        )
+        self.drain()
+        assert not OutgoingEmail.objects.exists(), (
+            'Проверьте, что команда `send_queued_emails` удаляет '
+            'неотправленные письма старше EMAIL_QUEUE_FAILED_TTL.'
+        )
+
+    def test_05_batch_leased_once(self, client):
+        from api.outbox import claim_batch, lease_emails
+        from reviews.models import OutgoingEmail
+
+        for idx in range(3):
+            self.signup(client, f'lease{idx}')
+        # Второй воркер выбрал те же письма, но арендует их позже первого.
+        ids = list(OutgoingEmail.objects.values_list('pk', flat=True))
+        first = claim_batch(batch_size=10)
+        assert {email.pk for email in first} == set(ids)
+        assert lease_emails(ids, timezone.now()) == [], (
+            'Проверьте, что письма, арендованные одним воркером, не '
+            'достаются другому.'
+        )
+        assert claim_batch(batch_size=10) == []
@@ -0,0 +1,186 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ConfirmationCode:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+    TOKEN_URL = '/api/v1/auth/token/'
+    USERNAME = 'code_user'
+
+    def request_code(self, client):
+        response = client.post(self.SIGNUP_URL, {
+            'username': self.USERNAME, 'email': 'code_user@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        call_command('send_queued_emails', stdout=StringIO())
+        return mail.outbox[-1].body.rsplit(' ', 1)[-1]
+
+    def obtain_token(self, client, code):
+        return client.post(self.TOKEN_URL, {
+            'username': self.USERNAME, 'confirmation_code': code
+        })
+
+    def test_01_code_is_not_a_password(self, client, django_user_model):
+        from reviews.models import ConfirmationCode
+
+        code = self.request_code(client)
+        user = django_user_model.objects.get(username=self.USERNAME)
+        assert not user.has_usable_password(), (
+            f'Проверьте, что POST-запрос к `{self.SIGNUP_URL}` не сохраняет '
+            'код подтверждения как пароль пользователя.'
+        )
+        stored = ConfirmationCode.objects.get(user=user)
+        assert code not in (stored.code_hash, stored.salt), (
+            'Проверьте, что код подтверждения хранится только в виде хеша.'
+        )
+
+        response = self.obtain_token(client, code)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что код из письма позволяет получить токен.'
+        )
+        assert 'token' in response.json()
+        response = self.obtain_token(client, code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения одноразовый.'
+        )
+
+    def test_02_new_code_replaces_old(self, client):
+        old_code = self.request_code(client)
+        new_code = self.request_code(client)
+        assert self.obtain_token(client, old_code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что новый код подтверждения заменяет прежний.'
+        assert self.obtain_token(client, new_code).status_code == (
+            HTTPStatus.OK
+        )
+
+    def test_03_attempts_are_limited(self, client, settings):
+        settings.CONFIRMATION_CODE_MAX_ATTEMPTS = 2
+        code = self.request_code(client)
+        for _ in range(settings.CONFIRMATION_CODE_MAX_ATTEMPTS):
+            assert self.obtain_token(client, 'invalid').status_code == (
+                HTTPStatus.BAD_REQUEST
+            )
+        assert self.obtain_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), (
+            'Проверьте, что после CONFIRMATION_CODE_MAX_ATTEMPTS неверных '
+            'попыток код подтверждения больше не принимается.'
+        )
+
+    def test_04_expired_code(self, client):
+        from reviews.models import ConfirmationCode
+
+        code = self.request_code(client)
+        ConfirmationCode.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        assert self.obtain_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что просроченный код подтверждения не принимается.'
+
+    def test_05_token_queries(self, client, django_assert_max_num_queries):
+        code = self.request_code(client)
+        # Третий запрос — версия claims, записываемая в токен.
+        with django_assert_max_num_queries(3):
+            response = self.obtain_token(client, code)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_06_concurrent_code_insert(self, client, django_user_model,
+                                       monkeypatch):
+        from django.db.models import QuerySet
+
+        from api.confirmation import issue_code
+        from reviews.models import ConfirmationCode
+
+        code = self.request_code(client)
+        user = django_user_model.objects.get(username=self.USERNAME)
+        # Параллельный запрос вставляет код между UPDATE, не нашедшим
+        # строки, и вставкой: вставка получит IntegrityError на OneToOne.
+        update = QuerySet.update
+        missed = []
+
+        def update_after_concurrent_insert(queryset, **kwargs):
+            if queryset.model is ConfirmationCode and not missed:
+                missed.append(True)
+                return 0
+            return update(queryset, **kwargs)
+
+        monkeypatch.setattr(QuerySet, 'update', update_after_concurrent_insert)
+        new_code = issue_code(user)
+        monkeypatch.undo()
+        assert ConfirmationCode.objects.filter(user=user).count() == 1
+        assert self.obtain_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
+        assert self.obtain_token(client, new_code).status_code == (
+            HTTPStatus.OK
+        ), (
+            'Проверьте, что код, вставленный параллельным запросом, '
+            'заменяется новым без ошибки.'
+        )
+
+    def test_07_legacy_password_code(self, client, django_user_model):
+        from reviews.models import ConfirmationCode
+
+        self.request_code(client)
+        user = django_user_model.objects.get(username=self.USERNAME)
+        ConfirmationCode.objects.filter(user=user).delete()
+        user.set_password('legacycode1')
+        user.save()
+        assert self.obtain_token(client, 'wrong').status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
+        assert self.obtain_token(client, 'legacycode1').status_code == (
+            HTTPStatus.OK
+        ), (
+            'Проверьте, что код, сохранённый паролем до появления '
+            'ConfirmationCode, принимается.'
+        )
+        assert self.obtain_token(client, 'legacycode1').status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что код, сохранённый паролем, погашается.'
+        self.request_code(client)
+        assert self.obtain_token(client, 'legacycode1').status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что новый код заменяет код, сохранённый паролем.'
+
+    def test_08_legacy_code_attempts(self, client, django_user_model,
+                                     settings, monkeypatch):
+        from reviews.models import ConfirmationCode
+
+        self.request_code(client)
+        user = django_user_model.objects.get(username=self.USERNAME)
+        ConfirmationCode.objects.filter(user=user).delete()
+        user.set_password('legacycode1')
+        user.save()
+        checks = []
+        check_password = django_user_model.check_password
+
+        def counted_check(self, raw_password):
+            checks.append(raw_password)
+            return check_password(self, raw_password)
+
+        monkeypatch.setattr(
+            django_user_model, 'check_password', counted_check
+        )
+        for _ in range(settings.CONFIRMATION_CODE_MAX_ATTEMPTS + 2):
+            self.obtain_token(client, 'wrong')
+        assert self.obtain_token(client, 'legacycode1').status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), (
+            'Проверьте, что число попыток для кода, сохранённого паролем, '
+            'ограничено так же, как для новых кодов.'
+        )
+        assert len(checks) == settings.CONFIRMATION_CODE_MAX_ATTEMPTS, (
+            'Проверьте, что после исчерпания попыток пароль больше не '
+            'проверяется.'
+        )
@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.db import connections
+from django.test import Client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Signup:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+    THREADS = 8
+    ATTEMPTS = 32
+
+    def test_01_signup_queries(self, client, django_assert_max_num_queries):
+        data = {'username': 'signup_user', 'email': 'signup_user@yamdb.fake'}
+        with django_assert_max_num_queries(6):
+            response = client.post(self.SIGNUP_URL, data)
+        assert response.status_code == HTTPStatus.OK
+        with django_assert_max_num_queries(3):
+            response = client.post(self.SIGNUP_URL, data)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что повторный POST-запрос к `{self.SIGNUP_URL}` '
+            'выдаёт новый код зарегистрированному пользователю.'
+        )
+        with django_assert_max_num_queries(1):
+            response = client.post(self.SIGNUP_URL, {
+                'username': 'signup_user', 'email': 'other@yamdb.fake'
+            })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert set(response.json()) == {'username'}
+
+    def test_02_concurrent_signup(self, django_user_model):
+        requests = [
+            {'username': 'racer', 'email': 'racer@yamdb.fake'},
+            {'username': 'racer', 'email': 'racer_other@yamdb.fake'},
+        ]
+
+        def signup(idx):
+            try:
+                return Client().post(
+                    self.SIGNUP_URL, requests[idx % len(requests)]
+                ).status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            statuses = list(executor.map(signup, range(self.ATTEMPTS)))
+        assert set(statuses) <= {HTTPStatus.OK, HTTPStatus.BAD_REQUEST}, (
+            f'Проверьте, что параллельные POST-запросы к `{self.SIGNUP_URL}` '
+            'не приводят к ошибкам сервера.'
+        )
+        users = django_user_model.objects.filter(
+            email__startswith='racer'
+        )
+        assert users.count() == 1, (
+            'Проверьте, что параллельная регистрация не создаёт дубликатов '
+            'пользователей.'
+        )
+        user = users.get()
+        expected = {
+            HTTPStatus.OK if (
+                data['username'] == user.username
+                and data['email'] == user.email
+            ) else HTTPStatus.BAD_REQUEST
+            for data in requests
+        }
+        assert set(statuses) == expected
+
+    def test_03_locked_database(self, client, monkeypatch, settings):
+        from django.db import OperationalError
+
+        from api.views import AuthenticationViewset
+
+        register = AuthenticationViewset.register
+        failures = []
+
+        def locked_once(self, request):
+            if not failures:
+                failures.append(request)
+                raise OperationalError('database table is locked')
+            return register(self, request)
+
+        monkeypatch.setattr(AuthenticationViewset, 'register', locked_once)
+        data = {'username': 'locked', 'email': 'locked@yamdb.fake'}
+        response = client.post(self.SIGNUP_URL, data)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{self.SIGNUP_URL}` повторяется, '
+            'если таблица заблокирована параллельной записью.'
+        )
+
+        def always_locked(self, request):
+            raise OperationalError('database table is locked')
+
+        monkeypatch.setattr(AuthenticationViewset, 'register', always_locked)
+        settings.SIGNUP_LOCK_RETRIES = 2
+        response = client.post(self.SIGNUP_URL, data)
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE, (
+            f'Проверьте, что POST-запрос к `{self.SIGNUP_URL}` при занятой '
+            'базе возвращает ответ со статусом 503.'
+        )
+        assert response['Retry-After']
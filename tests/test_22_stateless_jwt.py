@@ -0,0 +1,137 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22StatelessJWT:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+    TOKEN_URL = '/api/v1/auth/token/'
+    ME_URL = '/api/v1/users/me/'
+    USERS_URL = '/api/v1/users/'
+
+    def obtain_token(self, client, username='stateless'):
+        client.post(self.SIGNUP_URL, {
+            'username': username, 'email': f'{username}@yamdb.fake'
+        })
+        call_command('send_queued_emails', stdout=StringIO())
+        code = mail.outbox[-1].body.rsplit(' ', 1)[-1]
+        response = client.post(self.TOKEN_URL, {
+            'username': username, 'confirmation_code': code
+        })
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['token']
+
+    def token_client(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def test_01_token_claims(self, client):
+        token = AccessToken(self.obtain_token(client))
+        assert token['username'] == 'stateless'
+        assert token['role'] == 'user', (
+            f'Проверьте, что токен от `{self.TOKEN_URL}` содержит роль '
+            'пользователя.'
+        )
+
+    def test_02_no_user_query(self, client, django_assert_num_queries):
+        user_client = self.token_client(self.obtain_token(client))
+        # Версия claims и пользователь, которого загружает представление.
+        with django_assert_num_queries(2):
+            response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что аутентификация по claims токена не загружает '
+            f'пользователя, а `{self.ME_URL}` загружает его один раз.'
+        )
+        assert response.json()['email'] == 'stateless@yamdb.fake'
+
+    def test_03_role_change_invalidation(self, client, admin_client):
+        user_client = self.token_client(self.obtain_token(client))
+        assert user_client.get(self.USERS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        admin_client.patch(f'{self.USERS_URL}stateless/', {'role': 'admin'})
+        assert user_client.get(self.USERS_URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение роли действует на уже выданные '
+            'токены.'
+        )
+        admin_client.delete(f'{self.USERS_URL}stateless/')
+        assert user_client.get(self.ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что токены удалённого пользователя отклоняются.'
+
+    def test_04_token_without_claims(self, user_client,
+                                     django_assert_num_queries):
+        user_client.get(self.ME_URL)
+        with django_assert_num_queries(2):
+            response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что пользователь для токена без claims кешируется '
+            'в процессе.'
+        )
+
+    def test_05_demotion_shared_between_processes(self, client,
+                                                  admin_client):
+        from django.core.cache import cache
+
+        self.obtain_token(client)
+        admin_client.patch(f'{self.USERS_URL}stateless/', {'role': 'admin'})
+        admin_token = self.obtain_token(client)
+        assert AccessToken(admin_token)['role'] == 'admin'
+        user_client = self.token_client(admin_token)
+        assert user_client.get(self.USERS_URL).status_code == HTTPStatus.OK
+
+        admin_client.patch(f'{self.USERS_URL}stateless/', {'role': 'user'})
+        # Отзыв токенов не должен зависеть от локального кеша процесса:
+        # переполненный кеш вытесняет записи.
+        for idx in range(400):
+            cache.set(f'filler-{idx}', idx)
+        cache.clear()
+        assert user_client.get(self.USERS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), (
+            'Проверьте, что понижение роли действует на выданные токены '
+            'во всех процессах и не теряется при вытеснении из кеша.'
+        )
+
+    def test_06_revocation_scoped_to_user(self, client, admin_client,
+                                          django_assert_num_queries):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from reviews.models import ModelVersion
+
+        other_client = self.token_client(self.obtain_token(client, 'other'))
+        user_client = self.token_client(self.obtain_token(client))
+        other_client.get(self.ME_URL)
+
+        response = user_client.patch(self.ME_URL, {'bio': 'Новое о себе'})
+        assert response.status_code == HTTPStatus.OK
+        for token_client in (user_client, other_client):
+            with django_assert_num_queries(2):
+                token_client.get(self.ME_URL)
+        admin_client.patch(f'{self.USERS_URL}stateless/', {'role': 'admin'})
+        with django_assert_num_queries(2):
+            other_client.get(self.ME_URL)
+        assert user_client.get(self.USERS_URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение роли отзывает claims токенов только '
+            'этого пользователя, а правка профиля их не отзывает.'
+        )
+
+        user_versions = ModelVersion.objects.filter(
+            label__startswith='reviews.user:claims:'
+        )
+        user_versions.update(modified=timezone.now() - timedelta(days=2))
+        admin_client.patch(f'{self.USERS_URL}other/', {'role': 'moderator'})
+        assert user_versions.count() == 1, (
+            'Проверьте, что версии claims пользователей старше срока жизни '
+            'токена удаляются.'
+        )
@@ -0,0 +1,64 @@
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Permissions:
+
+    def token_request(self, user, method='DELETE'):
+        from api.authentication import token_user, user_claims
+
+        return SimpleNamespace(
+            method=method, user=token_user(user.pk, user_claims(user))
+        )
+
+    def test_01_object_checks_without_queries(
+        self, admin_client, admin, moderator, moderator_client, user,
+        user_client, django_assert_num_queries
+    ):
+        from api.permissions import IsOwnerOrModeratorOrReadOnly
+        from reviews.models import Review
+
+        create_reviews(admin_client, {
+            admin: admin_client, moderator: moderator_client,
+            user: user_client,
+        })
+        reviews = list(Review.objects.all())
+        permission = IsOwnerOrModeratorOrReadOnly()
+        with django_assert_num_queries(0):
+            moderated = [
+                permission.has_object_permission(
+                    self.token_request(moderator), None, review
+                )
+                for review in reviews
+            ]
+            owned = [
+                permission.has_object_permission(
+                    self.token_request(user), None, review
+                )
+                for review in reviews
+            ]
+        assert all(moderated), (
+            'Проверьте, что модератор может изменять любые отзывы.'
+        )
+        assert owned == [review.author_id == user.pk for review in reviews], (
+            'Проверьте, что пользователь может изменять только свои отзывы.'
+        )
+
+    def test_02_moderator_deletes_review(self, admin_client, admin,
+                                         moderator_client, user_client):
+        from reviews.models import Review
+
+        create_reviews(admin_client, {admin: admin_client})
+        review = Review.objects.get(author=admin)
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+        assert user_client.delete(url).status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что пользователь не может удалить чужой отзыв.'
+        )
+        assert moderator_client.delete(url).status_code == (
+            HTTPStatus.NO_CONTENT
+        ), 'Проверьте, что модератор может удалить чужой отзыв.'
@@ -0,0 +1,163 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Moderation:
+
+    MODERATION_URL = '/api/v1/moderation/{model}/bulk-{action}/'
+
+    def create_catalogue(self, admin_client, admin, moderator,
+                         moderator_client, user, user_client):
+        authors = {
+            admin: admin_client, moderator: moderator_client,
+            user: user_client,
+        }
+        comments, reviews, titles = create_comments(admin_client, authors)
+        create_single_review(user_client, titles[1]['id'], 'Второй отзыв', 1)
+        return comments, reviews, titles
+
+    def test_01_permissions(self, admin_client, admin, moderator,
+                            moderator_client, user, user_client, client):
+        _, reviews, titles = self.create_catalogue(
+            admin_client, admin, moderator, moderator_client, user,
+            user_client
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/bulk-delete/'
+        data = {'ids': [reviews[0]['id']]}
+        assert client.post(url, data).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.post(url, data).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), (
+            f'Проверьте, что POST-запрос пользователя к `{url}` '
+            'возвращает ответ со статусом 403.'
+        )
+        response = moderator_client.post(url, data)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'deleted': 1}
+
+    def test_02_bulk_delete_reviews(self, admin_client, admin, moderator,
+                                    moderator_client, user, user_client,
+                                    django_assert_num_queries):
+        from reviews.models import Comment, Review, Title
+        from reviews.ratings import find_rating_drift
+
+        _, reviews, _ = self.create_catalogue(
+            admin_client, admin, moderator, moderator_client, user,
+            user_client
+        )
+        ids = list(Review.objects.exclude(
+            pk=reviews[1]['id']
+        ).values_list('pk', flat=True))
+        url = self.MODERATION_URL.format(model='reviews', action='delete')
+        moderator_client.get('/api/v1/users/me/')
+        with django_assert_num_queries(10):
+            response = moderator_client.post(url, {'ids': ids})
+        assert response.json() == {'deleted': len(ids)}, (
+            f'Проверьте, что POST-запрос к `{url}` удаляет отзывы разных '
+            'произведений одним запросом.'
+        )
+        assert list(Review.objects.values_list('pk', flat=True)) == [
+            reviews[1]['id']
+        ]
+        assert not Comment.objects.exists(), (
+            'Проверьте, что вместе с отзывами удаляются комментарии к ним.'
+        )
+        assert not find_rating_drift().exists(), (
+            'Проверьте, что рейтинги затронутых произведений пересчитаны.'
+        )
+        assert list(Title.objects.order_by('pk').values_list(
+            'rating', flat=True
+        )) == [5, None]
+
+    def test_03_bulk_hide_reviews(self, admin_client, admin, moderator,
+                                  moderator_client, user, user_client):
+        from reviews.models import Title
+
+        _, reviews, titles = self.create_catalogue(
+            admin_client, admin, moderator, moderator_client, user,
+            user_client
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        hidden = reviews[0]['id']
+        response = moderator_client.post(
+            f'{reviews_url}bulk-hide/', {'ids': [hidden]}
+        )
+        assert response.json() == {'updated': 1}
+        visible = [
+            review['id']
+            for review in admin_client.get(reviews_url).json()['results']
+        ]
+        assert hidden not in visible and len(visible) == len(reviews) - 1, (
+            f'Проверьте, что скрытые отзывы не выводятся в `{reviews_url}`.'
+        )
+        assert admin_client.get(f'{reviews_url}{hidden}/').status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+        assert admin_client.get(
+            f'{reviews_url}{hidden}/comments/'
+        ).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии скрытого отзыва недоступны.'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.reviews_count == len(reviews) - 1, (
+            'Проверьте, что скрытые отзывы не учитываются в рейтинге.'
+        )
+
+        moderator_client.post(
+            f'{reviews_url}bulk-hide/', {'ids': [hidden], 'hidden': False}
+        )
+        title.refresh_from_db()
+        assert title.reviews_count == len(reviews), (
+            'Проверьте, что модератор может вернуть скрытый отзыв.'
+        )
+
+    def test_04_bulk_comments(self, admin_client, admin, moderator,
+                              moderator_client, user, user_client):
+        from reviews.models import Comment
+
+        comments, reviews, titles = self.create_catalogue(
+            admin_client, admin, moderator, moderator_client, user,
+            user_client
+        )
+        comments_url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        response = moderator_client.post(
+            f'{comments_url}bulk-hide/', {'ids': [comments[0]['id']]}
+        )
+        assert response.json() == {'updated': 1}
+        visible = [
+            comment['id']
+            for comment in admin_client.get(comments_url).json()['results']
+        ]
+        assert visible == [comment['id'] for comment in comments[1:]], (
+            f'Проверьте, что скрытые комментарии не выводятся в '
+            f'`{comments_url}`.'
+        )
+
+        url = self.MODERATION_URL.format(model='comments', action='delete')
+        response = moderator_client.post(
+            url, {'ids': [comment['id'] for comment in comments]}
+        )
+        assert response.json() == {'deleted': len(comments)}
+        assert not Comment.objects.exists()
+
+    def test_05_batch_limit(self, moderator_client):
+        from django.conf import settings
+
+        url = self.MODERATION_URL.format(model='reviews', action='hide')
+        ids = list(range(1, settings.MODERATION_BATCH_LIMIT + 2))
+        assert moderator_client.post(url, {'ids': ids}).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), (
+            f'Проверьте, что POST-запрос к `{url}` ограничивает число '
+            'объектов настройкой MODERATION_BATCH_LIMIT.'
+        )
+        assert moderator_client.post(url, {'ids': []}).status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
@@ -0,0 +1,157 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25BulkTitles:
+
+    URL = '/api/v1/titles/bulk/'
+
+    def titles_data(self, genres, categories, count):
+        return [
+            {
+                'name': f'Пакетное произведение {idx}',
+                'year': 2000 + idx,
+                'genre': [genre['slug'] for genre in genres[:1 + idx % 3]],
+                'category': categories[idx % 2]['slug'],
+                'description': f'Описание {idx}',
+            }
+            for idx in range(count)
+        ]
+
+    def test_01_bulk_create(self, admin_client):
+        from reviews.models import GenreTitle, Title
+
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = self.titles_data(genres, categories, 3)
+        response = admin_client.post(self.URL, data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.URL}` '
+            'со списком произведений возвращает ответ со статусом 201.'
+        )
+        created = response.json()
+        assert [title['name'] for title in created] == [
+            title['name'] for title in data
+        ]
+        assert [
+            {genre['slug'] for genre in title['genre']} for title in created
+        ] == [set(title['genre']) for title in data], (
+            'Проверьте, что произведения создаются с жанрами из запроса.'
+        )
+        assert created[1]['category']['slug'] == categories[1]['slug']
+        assert Title.objects.count() == 3
+        assert GenreTitle.objects.count() == 6
+
+        found = admin_client.get('/api/v1/titles/?search=пакетное').json()
+        assert found['count'] == 3, (
+            'Проверьте, что созданные пакетом произведения находятся '
+            'поиском.'
+        )
+
+    def test_02_queries_do_not_grow(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        counts = []
+        for size in (1, 10):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    self.URL, self.titles_data(genres, categories, size),
+                    format='json',
+                )
+            assert response.status_code == HTTPStatus.CREATED
+            counts.append(len(context))
+        assert counts[0] == counts[1], (
+            f'Проверьте, что число запросов к `{self.URL}` не зависит от '
+            'числа произведений в пакете.'
+        )
+
+    def test_03_item_errors(self, admin_client):
+        from reviews.models import Title
+
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = self.titles_data(genres, categories, 3)
+        data[1]['genre'] = ['unknown']
+        data[2]['year'] = 3000
+        data[2]['category'] = 'unknown'
+        response = admin_client.post(self.URL, data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == 3 and errors[0] == {}, (
+            f'Проверьте, что ошибки `{self.URL}` выдаются списком по '
+            'элементам пакета.'
+        )
+        assert set(errors[1]) == {'genre'}
+        assert set(errors[2]) == {'year'}
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке не создаётся ни одно произведение.'
+        )
+
+        data[2]['year'] = 2000
+        errors = admin_client.post(self.URL, data, format='json').json()
+        assert set(errors[2]) == {'category'}
+        assert admin_client.post(
+            self.URL, [], format='json'
+        ).status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_permissions_and_limit(self, admin_client, user_client,
+                                      settings):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = self.titles_data(genres, categories, 2)
+        assert user_client.post(
+            self.URL, data, format='json'
+        ).status_code == HTTPStatus.FORBIDDEN
+        settings.TITLES_BULK_CREATE_LIMIT = 1
+        assert admin_client.post(
+            self.URL, data, format='json'
+        ).status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что размер пакета ограничен настройкой '
+            'TITLES_BULK_CREATE_LIMIT.'
+        )
+
+    def test_05_deleted_ids_not_reused(self, admin_client):
+        from reviews.models import Title
+
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = self.titles_data(genres, categories, 2)
+        created = admin_client.post(self.URL, data, format='json').json()
+        Title.objects.filter(pk=created[-1]['id']).delete()
+        again = admin_client.post(self.URL, data, format='json').json()
+        assert min(title['id'] for title in again) > created[-1]['id'], (
+            'Проверьте, что ключи удалённых произведений не выдаются '
+            'повторно.'
+        )
+        assert [title['name'] for title in again] == [
+            title['name'] for title in data
+        ]
+
+    def test_06_conflict(self, admin_client, monkeypatch):
+        from django.db import IntegrityError
+
+        from reviews.models import GenreTitle, Title
+
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+
+        def conflicting_insert(*args, **kwargs):
+            raise IntegrityError('UNIQUE constraint failed')
+
+        monkeypatch.setattr(
+            GenreTitle.objects, 'bulk_create', conflicting_insert
+        )
+        response = admin_client.post(
+            self.URL, self.titles_data(genres, categories, 2), format='json'
+        )
+        assert response.status_code == HTTPStatus.CONFLICT, (
+            f'Проверьте, что конфликт с параллельной записью в `{self.URL}` '
+            'возвращает ответ со статусом 409.'
+        )
+        assert not Title.objects.exists()